@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecrdeps import includeParentAndDeps       #DO_NOT_DISTRIBUTE
+includeParentAndDeps(__file__)                   #DO_NOT_DISTRIBUTE
+
+from argparse import ArgumentParser
+from os.path import join, dirname, abspath
+from shutil import rmtree
+from subprocess import run, PIPE, DEVNULL
+from sys import version, exit
+from tempfile import mkdtemp
+from time import time
+from timeit import Timer
+
+from simplejson import dump, load
+
+from weightless.core import compose
+from meresco.html import DynamicHtml, TagFactory, HtmlTable, Column, tag_compose
+from meresco.html.login import PasswordFile
+
+BENCHMARKS = {}
+
+def benchmark(f):
+    BENCHMARKS[f.__name__] = f
+    return f
+
+def drain(generator):
+    for data in compose(generator):
+        pass
+
+def dynamicHtml(tempdir, templates):
+    for name, source in templates.items():
+        with open(join(tempdir, name + '.sf'), 'w') as f:
+            f.write(source)
+    return DynamicHtml([tempdir])
+
+@benchmark
+def handleRequestFlat(tempdir):
+    d = dynamicHtml(tempdir, {'flat': """
+def main(tag, **kwargs):
+    for i in range(1000):
+        with tag('span', class_=['item']):
+            yield 'item & '
+        yield str(i)
+"""})
+    return lambda: drain(d.handleRequest(path='/flat'))
+
+@benchmark
+def handleRequestNested(tempdir):
+    d = dynamicHtml(tempdir, {'nested': """
+def nested(tag, depth):
+    with tag('div', class_=['level']):
+        yield str(depth)
+        if depth:
+            yield nested(tag, depth - 1)
+
+def main(tag, **kwargs):
+    for i in range(20):
+        yield nested(tag, 50)
+"""})
+    return lambda: drain(d.handleRequest(path='/nested'))
+
+@benchmark
+def handleRequestPipelined(tempdir):
+    d = dynamicHtml(tempdir, dict((name, """
+def main(tag, pipe, **kwargs):
+    with tag('div', id_='%s'):
+        for i in range(100):
+            yield str(i)
+        yield pipe
+""" % name) for name in 'abcdefgh'))
+    return lambda: drain(d.handleRequest(path='/a/b/c/d/e/f/g/h'))
+
+@benchmark
+def tagManyAttributes(tempdir):
+    def render():
+        tag = TagFactory()
+        for i in range(1000):
+            with tag('input', id_='field%s' % i, class_=['a', 'b', 'c'], name='name', value='"value" & more', type_='text', title='title', data_index=i, disabled=None):
+                pass
+        return tag.lines()
+    return render
+
+@benchmark
+def htmlTableRender(tempdir):
+    table = HtmlTable()
+    for label in ['one', 'two', 'three']:
+        table.addColumn(Column(label))
+    items = list(range(10000))
+    return lambda: table.render(items=items)
+
+@benchmark
+def tagCompose(tempdir):
+    @tag_compose
+    def box(tag, title):
+        with tag('div', class_=['box']):
+            with tag('h2'):
+                yield title
+            yield
+    def render():
+        tag = TagFactory()
+        for i in range(1000):
+            with box(tag, 'title & more'):
+                tag.stream.write('content')
+        return tag.lines()
+    return render
+
+@benchmark
+def passwordFileValidateUser(tempdir):
+    passwordFile = PasswordFile(join(tempdir, 'passwd'), createAdminUserIfEmpty=False)
+    passwordFile.addUser('john', 'secret')
+    def validate():
+        for i in range(100):
+            passwordFile.validateUser('john', 'secret')
+            passwordFile.validateUser('john', 'wrong')
+    return validate
+
+def measure(name, repeat):
+    tempdir = mkdtemp()
+    try:
+        timer = Timer(BENCHMARKS[name](tempdir))
+        number, _ = timer.autorange()
+        seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+        return dict(seconds=seconds, perSecond=1 / seconds, number=number, repeat=repeat)
+    finally:
+        rmtree(tempdir)
+
+def currentCommit():
+    result = run(['git', 'rev-parse', 'HEAD'], cwd=dirname(abspath(__file__)), stdout=PIPE, stderr=DEVNULL, universal_newlines=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        change = result['seconds'] / baseline[name]['seconds'] - 1
+        print("  {:<28} {:+8.1%}".format(name, change))
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = ArgumentParser(description="Benchmark the rendering hot paths of Meresco Html.")
+    parser.add_argument('names', nargs='*', help="benchmarks to run, default all: {}".format(', '.join(BENCHMARKS)))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="allowed slowdown before failing a comparison, default 0.1")
+    options = parser.parse_args()
+
+    names = options.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmarks: {}".format(', '.join(unknown)))
+    results = {}
+    for name in names:
+        results[name] = measure(name, options.repeat)
+        print("  {:<28} {:12.3f} ms {:12.1f}/s".format(name, results[name]['seconds'] * 1000, results[name]['perSecond']))
+    if options.output:
+        with open(options.output, 'w') as f:
+            dump(dict(commit=currentCommit(), python=version, timestamp=time(), results=results), f, indent=4, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = load(f)
+        print("Compared with {}:".format(baseline.get('commit') or options.compare))
+        regressions = compare(results, baseline['results'], options.tolerance)
+        if regressions:
+            print("Slower than allowed: {}".format(', '.join(regressions)))
+            exit(1)
+
+if __name__ == '__main__':
+    main()
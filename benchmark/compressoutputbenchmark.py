@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecrdeps import includeParentAndDeps       #DO_NOT_DISTRIBUTE
+includeParentAndDeps(__file__)                   #DO_NOT_DISTRIBUTE
+
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import process_time
+
+from meresco.core import Observable
+from weightless.core import be, compose
+from meresco.html import DynamicHtml, CompressOutput
+
+TEMPLATE = """
+def main(tag, **kwargs):
+    with tag('table'):
+        for i in range(%(rows)s):
+            with tag('tr', class_=['odd' if i %% 2 else 'even']):
+                with tag('td'):
+                    yield 'Row number %%s' %% i
+                with tag('td'):
+                    with tag('a', href='/item?id=%%s' %% i):
+                        yield 'Item & details'
+"""
+
+def request(dna):
+    return sum(len(data) for data in compose(dna.all.handleRequest(path='/page', Headers={'Accept-Encoding': 'gzip'})) if type(data) is bytes)
+
+def measure(dna, number):
+    size = request(dna)
+    t0 = process_time()
+    for i in range(number):
+        request(dna)
+    return (process_time() - t0) / number, size
+
+def main(rows=2000, number=20):
+    tempdir = mkdtemp()
+    try:
+        with open(join(tempdir, 'page.sf'), 'w') as f:
+            f.write(TEMPLATE % dict(rows=rows))
+        dynamicHtml = DynamicHtml([tempdir], outputBytes=True)
+        plainTime, plainSize = measure(be((Observable(), (dynamicHtml,))), number)
+        print("Compression, {} table rows per page:".format(rows))
+        print("  {:<8} {:8.2f} ms/page {:10} bytes".format('none', plainTime * 1000, plainSize))
+        for level in [1, 6, 9]:
+            seconds, size = measure(be((Observable(), (CompressOutput(level=level), (dynamicHtml,)))), number)
+            print("  {:<8} {:8.2f} ms/page {:10} bytes  +{:.2f} ms CPU, {:.1%} saved".format(
+                'level %s' % level, seconds * 1000, size, (seconds - plainTime) * 1000, 1 - size / plainSize))
+    finally:
+        rmtree(tempdir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecrdeps import includeParentAndDeps       #DO_NOT_DISTRIBUTE
+includeParentAndDeps(__file__)                   #DO_NOT_DISTRIBUTE
+
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+
+from weightless.core import compose, Yield
+from meresco.html import DynamicHtml, TagFactory
+
+TEMPLATE = """
+def main(tag, **kwargs):
+    for i in range(%(items)s):
+        with tag('span'):
+            yield 'item & '
+        yield str(i)
+"""
+
+@compose
+def legacyOutputLoop(generators, tag):
+    # The handleRequest output loop as it was before coalescing.
+    for line in generators:
+        yield tag.lines()
+        yield line if line is Yield or callable(line) or type(line) is bytes else tag.escape(line)
+    yield tag.lines()
+
+def itemsPerSecond(render, items, number):
+    t0 = time()
+    for i in range(number):
+        for chunk in render():
+            pass
+    return items * 2 * number / (time() - t0)
+
+def main(items=10000, number=20):
+    tempdir = mkdtemp()
+    try:
+        with open(join(tempdir, 'page.sf'), 'w') as f:
+            f.write(TEMPLATE % dict(items=items))
+        d = DynamicHtml([tempdir])
+        main = d.getModule('page').main
+        def legacy():
+            tag = TagFactory()
+            return legacyOutputLoop(compose(main(tag=tag)), tag)
+        def current():
+            return d.handleRequest(path='/page')
+        print("Output loop, {} items per page:".format(items * 2))
+        print("  {:<8} {:12.0f} items/s".format('before', itemsPerSecond(legacy, items, number)))
+        print("  {:<8} {:12.0f} items/s".format('after', itemsPerSecond(current, items, number)))
+    finally:
+        rmtree(tempdir)
+
+if __name__ == '__main__':
+    main()
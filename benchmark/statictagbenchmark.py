@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecrdeps import includeParentAndDeps       #DO_NOT_DISTRIBUTE
+includeParentAndDeps(__file__)                   #DO_NOT_DISTRIBUTE
+
+from timeit import timeit
+
+from meresco.html import TagFactory
+from meresco.html.templatecompiler import compileTemplate
+from meresco.html._html._tag import statictag
+
+SOURCE = """
+def page(tag):
+    with tag('div.container', id_='main'):
+        for i in range(100):
+            with tag('div.row'):
+                with tag('span.label', title='label'):
+                    yield 'label'
+                with tag('a.button', href='/path', class_=['btn', 'primary']):
+                    yield 'link'
+"""
+
+def render(foldStaticTags):
+    moduleGlobals = {'__builtins__': {'__statictag__': statictag, 'range': range}}
+    exec(compileTemplate(SOURCE, 'benchmark.sf', foldStaticTags=foldStaticTags), moduleGlobals)
+    page = moduleGlobals['page']
+    def _render():
+        tag = TagFactory()
+        for line in page(tag):
+            tag.write(tag.escape(line))
+        return tag.stream.getvalue()
+    return _render
+
+def main(number=200):
+    plain = timeit(render(foldStaticTags=False), number=number) / number
+    folded = timeit(render(foldStaticTags=True), number=number) / number
+    print("Rendering 301 tags:")
+    print("  {:<8} {:8.3f} ms".format('tags', plain * 1000))
+    print("  {:<8} {:8.3f} ms".format('folded', folded * 1000))
+    print("  speedup  {:8.1f}x".format(plain / folded))
+
+if __name__ == '__main__':
+    main()
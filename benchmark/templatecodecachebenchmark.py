@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecrdeps import includeParentAndDeps       #DO_NOT_DISTRIBUTE
+includeParentAndDeps(__file__)                   #DO_NOT_DISTRIBUTE
+
+from os import makedirs
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+
+from weightless.core import asString
+from meresco.html import DynamicHtml
+
+TEMPLATE = """
+def helper{n}(tag, items):
+    with tag('ul.items', id_='list{n}'):
+        for item in items:
+            with tag('li', class_=['item', 'n{n}']):
+                yield item
+"""
+
+def createTemplates(directory, nrOfTemplates, nrOfHelpers):
+    for i in range(nrOfTemplates):
+        with open(join(directory, 'page{}.sf'.format(i)), 'w') as f:
+            for n in range(nrOfHelpers):
+                f.write(TEMPLATE.format(n=n))
+            f.write("\ndef main(tag, **kwargs):\n    yield helper0(tag, ['a', 'b'])\n")
+
+def firstRequests(directory, nrOfTemplates, **kwargs):
+    t0 = time()
+    d = DynamicHtml([directory], **kwargs)
+    for i in range(nrOfTemplates):
+        asString(d.handleRequest(path='/page{}'.format(i)))
+    return time() - t0
+
+def main(nrOfTemplates=200, nrOfHelpers=50):
+    tempdir = mkdtemp()
+    try:
+        templates = join(tempdir, 'templates')
+        cacheDir = join(tempdir, 'cache')
+        makedirs(templates)
+        createTemplates(templates, nrOfTemplates, nrOfHelpers)
+        results = [
+            ('no cache', firstRequests(templates, nrOfTemplates)),
+            ('cold cache', firstRequests(templates, nrOfTemplates, codeCacheDirectory=cacheDir)),
+            ('warm cache', firstRequests(templates, nrOfTemplates, codeCacheDirectory=cacheDir)),
+        ]
+        print("First request for {} templates ({} helpers each):".format(nrOfTemplates, nrOfHelpers))
+        for name, duration in results:
+            print("  {:<12} {:8.1f} ms".format(name, duration * 1000))
+    finally:
+        rmtree(tempdir)
+
+if __name__ == '__main__':
+    main()
@@ -31,4 +31,8 @@
 from .dynamichtml import DynamicHtml, urlencode
 from .postactions import PostActions
 from .objectregistry import ObjectRegistry
+from .coalesceoutput import CoalesceOutput
+from .compressoutput import CompressOutput
+from .http11output import Http11Output
+from .templateloaders import FileSystemLoader, ZipLoader, DictLoader
 from ._html import *
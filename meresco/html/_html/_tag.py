@@ -128,9 +128,16 @@ class TagFactory(object):
 
     def lines(self):
         if self.stream.tell():
-            yield self.stream.getvalue()
-            self.stream.truncate(0)
-            self.stream.seek(0)
+            yield self.flush()
+
+    def flush(self):
+        value = self.stream.getvalue()
+        self.stream.truncate(0)
+        self.stream.seek(0)
+        return value
+
+    def flushBytes(self):
+        return self.flush().encode('utf-8')
 
     def escape(self, obj):
         if isinstance(obj, bytes):
@@ -165,6 +172,40 @@ def tag_compose(f, __bw_compat__=False):
             tag._exit_callback()
     return ctx_man
 
+class StaticTag(object):
+    __slots__ = ('_factory', '_open', '_close')
+
+    def __init__(self, factory, openTag, closeTag):
+        self._factory = factory
+        self._open = openTag
+        self._close = closeTag
+
+    def __enter__(self):
+        factory = self._factory
+        factory._count += 1
+        factory.stream.write(self._open)
+
+    def __exit__(self, *a, **kw):
+        factory = self._factory
+        factory._count -= 1
+        factory.stream.write(self._close)
+
+def statictag(factory, openTag, closeTag):
+    # Only for exactly a TagFactory; anything else falls back to a normal call.
+    if type(factory) is TagFactory:
+        return StaticTag(factory, openTag, closeTag)
+
+def renderStaticTag(tagname, **attrs):
+    parts = []
+    class _Html(object):
+        write = staticmethod(parts.append)
+    tag = Tag(_Html(), tagname, **attrs)
+    tag.__enter__()
+    openTag = ''.join(parts)
+    del parts[:]
+    tag.__exit__(None, None, None)
+    return openTag, ''.join(parts)
+
 class AsIs(str):
     def replace(self, *args):
         return self
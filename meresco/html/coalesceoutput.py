@@ -0,0 +1,56 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from meresco.core import Observable
+from meresco.components.http.utils import ensureBytes
+from weightless.core import compose, Yield
+
+class CoalesceOutput(Observable):
+    def __init__(self, chunkSize=64 * 1024, **kwargs):
+        Observable.__init__(self, **kwargs)
+        self._chunkSize = chunkSize
+
+    @compose
+    def handleRequest(self, *args, **kwargs):
+        chunkSize = self._chunkSize
+        buffer = []
+        size = 0
+        for data in compose(self.all.handleRequest(*args, **kwargs)):
+            if data is Yield or callable(data):
+                if buffer:
+                    yield b''.join(buffer)
+                    buffer = []
+                    size = 0
+                yield data
+                continue
+            data = ensureBytes(data)
+            buffer.append(data)
+            size += len(data)
+            if size >= chunkSize:
+                yield b''.join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield b''.join(buffer)
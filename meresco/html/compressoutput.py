@@ -0,0 +1,138 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from zlib import compressobj, DEFLATED, MAX_WBITS, Z_SYNC_FLUSH
+
+from meresco.core import Observable
+from meresco.components.http.utils import ensureBytes
+from weightless.core import compose, Yield
+
+from .responseheaders import HeaderReader, addHeaders, removeHeaders, headerValue, requestHeader, statusCode
+
+WBITS = {'gzip': 16 + MAX_WBITS, 'deflate': MAX_WBITS}
+
+class CompressOutput(Observable):
+    def __init__(self, level=6, minimumSize=1024, encodings=('gzip', 'deflate'), **kwargs):
+        Observable.__init__(self, **kwargs)
+        self._level = level
+        self._minimumSize = minimumSize
+        self._encodings = encodings
+
+    @compose
+    def handleRequest(self, *args, **kwargs):
+        encoding = self._acceptedEncoding(kwargs.get('Headers'))
+        reader = HeaderReader()
+        header = None
+        passThrough = False
+        pending = []
+        pendingSize = 0
+        compressor = None
+        for data in compose(self.all.handleRequest(*args, **kwargs)):
+            if data is Yield or callable(data):
+                # The response suspends before its size is known: decide now, so
+                # everything written so far reaches the client before waiting.
+                if header is None:
+                    if reader.pending():
+                        header = reader.pending()
+                        passThrough = True
+                        yield reader.encode(header)
+                elif not (passThrough or compressor is not None):
+                    compressor = compressobj(self._level, DEFLATED, WBITS[encoding])
+                    yield reader.encode(self._compressedHeader(header, encoding))
+                    yield compressor.compress(b''.join(pending))
+                    pending = None
+                if compressor is not None:
+                    yield compressor.flush(Z_SYNC_FLUSH)
+                yield data
+                continue
+            if header is None:
+                result = reader.feed(data)
+                if result is None:
+                    continue
+                header, data = result
+                if not self._compressible(header):
+                    passThrough = True
+                    yield reader.encode(header)
+                elif encoding is None:
+                    passThrough = True
+                    yield reader.encode(self._addVary(header))
+                if not data:
+                    continue
+            data = ensureBytes(data)
+            if passThrough:
+                yield data
+            elif compressor is not None:
+                compressed = compressor.compress(data)
+                if compressed:
+                    yield compressed
+            else:
+                pending.append(data)
+                pendingSize += len(data)
+                if pendingSize >= self._minimumSize:
+                    compressor = compressobj(self._level, DEFLATED, WBITS[encoding])
+                    yield reader.encode(self._compressedHeader(header, encoding))
+                    yield compressor.compress(b''.join(pending))
+                    pending = None
+        if header is None:
+            if reader.pending():
+                yield reader.encode(reader.pending())
+        elif compressor is not None:
+            yield compressor.flush()
+        elif not passThrough:
+            yield reader.encode(self._addVary(header))
+            if pending:
+                yield b''.join(pending)
+
+    def _acceptedEncoding(self, Headers):
+        accepted = {}
+        for item in (requestHeader(Headers, 'Accept-Encoding') or '').split(','):
+            name, _, params = item.partition(';')
+            quality = 1.0
+            for param in params.split(';'):
+                key, _, value = param.partition('=')
+                if key.strip() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            accepted[name.strip().lower()] = quality
+        for encoding in self._encodings:
+            if accepted.get(encoding, accepted.get('*', 0.0)) > 0.0:
+                return encoding
+        return None
+
+    def _compressedHeader(self, header, encoding):
+        return self._addVary(addHeaders(removeHeaders(header, ['Content-Length']), [('Content-Encoding', encoding)]))
+
+    def _compressible(self, header):
+        return statusCode(header) == '200' and headerValue(header, 'Content-Encoding') is None
+
+    def _addVary(self, header):
+        vary = headerValue(header, 'Vary')
+        if vary is None:
+            return addHeaders(header, [('Vary', 'Accept-Encoding')])
+        if 'accept-encoding' in vary.lower() or vary.strip() == '*':
+            return header
+        return addHeaders(removeHeaders(header, ['Vary']), [('Vary', vary + ', Accept-Encoding')])
@@ -30,12 +30,14 @@
 #
 ## end license ##
 
-from glob import glob
-from os.path import join, isfile, dirname, basename
+from os.path import dirname, basename
 from traceback import format_exc
+import sys
 from itertools import groupby, islice
 from io import StringIO
 from contextlib import contextmanager
+from types import MappingProxyType
+from weakref import WeakSet
 
 from xml.sax.saxutils import escape as escapeXml, quoteattr
 from lxml.etree import parse, tostring
@@ -43,12 +45,14 @@ from time import time
 from urllib.parse import urlencode as _urlencode
 from math import ceil
 from functools import partial, reduce
+from hashlib import sha1
+from email.utils import formatdate, parsedate_tz, mktime_tz
 
 from meresco.components.json import JsonList, JsonDict
-from meresco.components.http.utils import ensureBytes
 from meresco.core import Observable, decorate
 
 from weightless.core import compose, Yield, NoneOfTheObserversRespond
+from weightless.io import Suspend
 
 from meresco.components import DirectoryWatcher
 import builtins as exceptions
@@ -57,8 +61,29 @@ from urllib.parse import urlsplit, urlunsplit
 
 from ._html import TagFactory, tag_compose
 from .utils import escapeHtml, parse_qs
+from .templatecodecache import TemplateCodeCache
+from .templatecompiler import compileTemplate
+from .templateloaders import FileSystemLoader
+from .fragmentcache import FragmentCache
+from .lrucache import LruCache
+from .templatemetrics import TemplateMetrics
+from .slowrequestlog import RequestTimings, TimedMessages, timed, isGenerator
+from .requestmemo import RequestMemo, MemoizedObservable
+from .gather import gather, GatherTimeout
+from .offload import offloadInline, OffloadQueueFull
+from ._html._tag import statictag
+from .responseheaders import HeaderReader, addHeaders, statusCode, headerValue, requestHeader
 
 CRLF = '\r\n'
+OUTPUT_CHUNK_SIZE = 8192
+STRONG_ETAG_MAX_SIZE = 1024 * 1024
+
+OK_HTML = 'HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n'
+OK_XML = 'HTTP/1.0 200 OK\r\nContent-Type: text/xml; charset=utf-8\r\n\r\n'
+OK_HTML_BYTES = OK_HTML.encode()
+OK_XML_BYTES = OK_XML.encode()
+OVERLOADED = 'HTTP/1.0 503 Service Unavailable\r\nRetry-After: {retryAfter}\r\nContent-Type: text/plain; charset=utf-8\r\n\r\nService temporarily overloaded.'
+DEADLINE_EXCEEDED = 'HTTP/1.0 504 Gateway Timeout\r\nContent-Type: text/plain; charset=utf-8\r\n\r\nRender deadline exceeded.'
 
 class TemplateModule(object):
     def __init__(self, load):
@@ -68,6 +93,14 @@ class TemplateModule(object):
     def _mustReload(self):
         self._globals = None
 
+    def _isLoaded(self):
+        return self._globals is not None
+
+    def _load(self):
+        if self._globals is None:
+            self._globals = self._loadGlobals()
+        return self._globals
+
     def __getattr__(self, attr):
         if self._globals is None:
             self._globals = self._loadGlobals()
@@ -81,6 +114,37 @@ class TemplateModule(object):
             return object.__setattr__(self, name, value)
         raise AttributeError("Set of an attribute is not allowed on a TemplateModule")
 
+class TemplateSnapshot(object):
+    def __init__(self, version):
+        self.version = version
+        self._templates = {}
+        self._imported = {}
+        self.templates = MappingProxyType(self._templates)
+
+    def add(self, templateName, template):
+        self._templates[templateName] = template
+
+    def module(self, moduleName, create):
+        template = self._templates.get(moduleName)
+        if template is None:
+            template = self._imported.get(moduleName)
+            if template is None:
+                template = self._imported[moduleName] = create(moduleName)
+        return template
+
+_noPolicy = {}.get
+
+class _Request(object):
+    __slots__ = ('snapshot', 'head', 'template', 'policy', 'timings', 'memo')
+
+    def __init__(self, snapshot, head):
+        self.snapshot = snapshot
+        self.head = head
+        self.template = snapshot.templates.get(head)
+        self.policy = _noPolicy if self.template is None else self.template._load().get
+        self.timings = None
+        self.memo = None
+
 class DynamicHtmlException(Exception):
     httpCodes = {
         500: 'Internal Server Error',
@@ -100,6 +164,44 @@ class DynamicHtmlException(Exception):
                 httpCodeText=self.httpCodes[self._httpCode]
             )
 
+class RenderDeadlineExceeded(Exception):
+    pass
+
+class _DeadlineGuard(object):
+    # Wraps a suspending callable; resumes the request when the deadline
+    # passes first. The server calls resumeWriter() and friends on what it
+    # was given, those go to the wrapped suspension which owns the handle.
+    def __init__(self, suspension, deadline):
+        self._suspension = suspension
+        self._deadline = deadline
+        self._whenDone = None
+        self.expired = False
+
+    def __call__(self, reactor, whenDone):
+        self._reactor = reactor
+        self._whenDone = whenDone
+        self._timer = reactor.addTimer(max(0, self._deadline - time()), self._expire)
+        self._suspension(reactor, self._resumed)
+
+    def __getattr__(self, name):
+        return getattr(self._suspension, name)
+
+    def _resumed(self):
+        if self._whenDone is None:
+            return
+        self._reactor.removeTimer(self._timer)
+        self._done()
+
+    def _expire(self):
+        if self._whenDone is None:
+            return
+        self.expired = True
+        self._done()
+
+    def _done(self):
+        whenDone, self._whenDone = self._whenDone, None
+        whenDone()
+
 def redirectTo(location, additionalHeaders=None, permanent=False):
     HTTP_CODE = "HTTP/1.0 302 Found\r\n"
     if permanent:
@@ -118,42 +220,227 @@ def urlencode(query, doseq=True):
 
 class ObservableProxy(object):
 
-    def __init__(self, observable):
+    def __init__(self, observable, currentTimings=None, currentMemo=None, gather=None):
         self.any = observable.any
         self.all = observable.all
         self.call = observable.call
         self.do = observable.do
         self.once = observable.once
+        if currentTimings is not None:
+            self.any, self.all, self.call, self.do, self.once = (TimedMessages(messages, currentTimings)
+                for messages in [self.any, self.all, self.call, self.do, self.once])
+        self.memo = MemoizedObservable(self, currentMemo or (lambda: None))
+        self.gather = gather
+
+
+def _isOkStatusLine(value):
+    return _isStatusLine(value) and value[9:12] in ('200', b'200')
+
+def _isStorable(parts):
+    reader = HeaderReader()
+    for part in parts:
+        result = reader.feed(part)
+        if result is not None:
+            break
+    else:
+        return False
+    header = result[0]
+    if headerValue(header, 'Set-Cookie') is not None:
+        return False
+    cacheControl = (headerValue(header, 'Cache-Control') or '').lower()
+    return not {'private', 'no-store'} & set(directive.partition('=')[0].strip() for directive in cacheControl.split(','))
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _notModified(Headers, validators):
+    validators = dict(validators)
+    ifNoneMatch = requestHeader(Headers, 'If-None-Match')
+    if ifNoneMatch is not None:
+        if 'ETag' not in validators:
+            return False
+        etag = _weakless(validators['ETag'])
+        return any(candidate == '*' or _weakless(candidate) == etag for candidate in (c.strip() for c in ifNoneMatch.split(',')))
+    ifModifiedSince = requestHeader(Headers, 'If-Modified-Since')
+    if ifModifiedSince is not None and 'Last-Modified' in validators:
+        since = parsedate_tz(ifModifiedSince)
+        return since is not None and mktime_tz(parsedate_tz(validators['Last-Modified'])) <= mktime_tz(since)
+    return False
+
+def _weakless(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+def _notModifiedResponse(validators):
+    return addHeaders('HTTP/1.0 304 Not Modified\r\n\r\n', validators)
+
+def _isStatusLine(value):
+    valueType = type(value)
+    if valueType is str:
+        return value.startswith('HTTP/1.')
+    if valueType is bytes:
+        return value.startswith(b'HTTP/1.')
+    return False
 
 
 class DynamicHtml(Observable):
-    def __init__(self, directories, reactor=None, prefix='', allowedModules=None, indexPage='', verbose=False, additionalGlobals=None, notFoundPage=None, watch=True, errorHandlingHook=None):
+    def __init__(self,
+            directories=None,
+            reactor=None,
+            prefix='',
+            allowedModules=None,
+            indexPage='',
+            verbose=False,
+            additionalGlobals=None,
+            notFoundPage=None,
+            watch=True,
+            errorHandlingHook=None,
+            loader=None, reloadDelay=None,
+            codeCacheDirectory=None, foldStaticTags=False,
+            chunkSize=OUTPUT_CHUNK_SIZE, outputBytes=False,
+            fragmentCacheMaxEntries=1000, fragmentCacheMaxBytes=10 * 1024 * 1024,
+            responseCacheMaxEntries=1000, responseCacheMaxBytes=50 * 1024 * 1024,
+            singleFlight=False, conditionalGet=False, strongETagMaxSize=STRONG_ETAG_MAX_SIZE,
+            profiler=None, slowRequestLog=None,
+            preloadTemplates=False, warmUpPaths=None,
+            renderDeadline=None, maxInFlight=None, maxQueued=0, retryAfter=1,
+            offloader=None):
         Observable.__init__(self)
         self._verbose = verbose
-        if type(directories) != list:
-            raise TypeError("Usage: DynamicHtml([aDirectory, ...], ....)")
-        self._directories = directories
+        if loader is None:
+            if type(directories) != list:
+                raise TypeError("Usage: DynamicHtml([aDirectory, ...], ....)")
+            loader = FileSystemLoader(directories)
+        elif directories is not None:
+            raise TypeError("Usage: DynamicHtml([aDirectory, ...], ....) or DynamicHtml(loader=aLoader, ....)")
+        self._loader = loader
         self._prefix = prefix
         self._indexPage = indexPage
         self._notFoundPage = notFoundPage
         self._allowedModules = allowedModules or []
-        self._templates = {}
+        self._snapshot = TemplateSnapshot(0)
+        self._snapshots = WeakSet()
+        self._imports = {}
+        self._reloadStatistics = dict(reloads=0, templatesReloaded=0, totalReloadTime=0.0, lastReloadTime=0.0, lastReloaded=[], coalescedEvents=0)
+        self._reloadDelay = reloadDelay
+        self._reloadTimer = None
+        self._pendingReload = set()
         self._additionalGlobals = additionalGlobals or {}
-        self._observableProxy = ObservableProxy(self)
+        self._slowRequestLog = slowRequestLog
+        self._request = None
+        self._memoStatistics = dict(hits=0, misses=0, uncacheable=0)
+        self._renderDeadline = renderDeadline
+        self._cancelledRenders = dict(deadlineExceeded=0, disconnected=0)
+        self._offload = offloadInline if offloader is None else offloader.offload
+        self._maxInFlight = maxInFlight
+        self._maxQueued = maxQueued
+        self._rendering = 0
+        self._renderingPerTemplate = {}
+        self._waiting = []
+        self._loadStatistics = dict(shed=0, queued=0, maxQueueDepth=0)
+        self._observableProxy = ObservableProxy(self,
+                currentTimings=None if slowRequestLog is None else self._currentTimings,
+                currentMemo=self._currentMemo,
+                gather=self._gather)
         self._errorHandlingHook = errorHandlingHook
+        self._chunkSize = chunkSize
+        self._outputBytes = outputBytes
+        self._overloaded = self._encode(OVERLOADED.format(retryAfter=retryAfter))
+        self._fragmentCache = FragmentCache(maxEntries=fragmentCacheMaxEntries, maxBytes=fragmentCacheMaxBytes)
+        self._responseCache = LruCache(maxEntries=responseCacheMaxEntries, maxBytes=responseCacheMaxBytes)
+        self._singleFlight = singleFlight
+        self._inFlight = {}
+        self._coalescedRequests = 0
+        self._conditionalGet = conditionalGet
+        self._strongETagMaxSize = strongETagMaxSize
+        self._templateMetrics = TemplateMetrics()
+        self._profiler = profiler
+        self._preloadTemplates = preloadTemplates
+        self._warmUpPaths = warmUpPaths or []
+        self._warmUpStatistics = None
+        self._compileSource = partial(compileTemplate, foldStaticTags=foldStaticTags)
+        self._codeCache = None if codeCacheDirectory is None else TemplateCodeCache(
+                codeCacheDirectory, compileSource=self._compileSource, variant='.folded' if foldStaticTags else '')
         self._initialize(reactor, watch=watch)
 
+    def observer_init(self):
+        if not (self._preloadTemplates or self._warmUpPaths):
+            return
+        t0 = time()
+        failures = []
+        if self._preloadTemplates:
+            for templateName, template in sorted(self._templates.items()):
+                error = template._load().get('__error__')
+                if error is not None:
+                    failures.append((templateName, error))
+        for path in self._warmUpPaths:
+            error = self._warmUp(path)
+            if error is not None:
+                failures.append((path, error))
+        self._warmUpStatistics = dict(
+                duration=time() - t0,
+                templates=len(self._templates) if self._preloadTemplates else 0,
+                paths=len(self._warmUpPaths),
+                failures=[name for name, error in failures])
+        for name, error in failures:
+            if self._errorHandlingHook:
+                self._errorHandlingHook(error, name, warmUp=True)
+            else:
+                sys.stderr.write('Warm-up of "{}" failed:\n{}\n'.format(name, error))
+        if self._verbose:
+            print('Warm-up took {duration:.3f}s for {templates} templates and {paths} paths, {0} failed'.format(len(failures), **self._warmUpStatistics))
+
+    def _warmUp(self, path):
+        path, _, query = path.partition('?')
+        errors = []
+        output = []
+        # Warm-up paths are template paths: no prefix, metrics, profiling or load shedding.
+        request = self._newRequest(path)
+        response = compose(self._cachedResponse(request, path, errors, query=query, arguments=parse_qs(query), Method='GET', Headers={}))
+        try:
+            for data in response:
+                if data is Yield:
+                    continue
+                if callable(data):
+                    return 'Rendering suspended, which warm-up cannot resume.'
+                output.append(data.decode('utf-8', 'replace') if type(data) is bytes else data)
+        except Exception:
+            return format_exc()
+        finally:
+            response.close()
+        response = ''.join(output)
+        if errors or not response[9:12].startswith(('2', '3')):
+            return response
+        return None
+
+    def getWarmUpStatistics(self):
+        return None if self._warmUpStatistics is None else dict(self._warmUpStatistics)
+
+    @property
+    def _templates(self):
+        return self._snapshot.templates
+
+    def _publish(self, snapshot):
+        self._snapshots.add(snapshot)
+        self._snapshot = snapshot
+
     def _loadAllTemplates(self):
-        self._templates.clear()
-        for directory in self._directories:
-            for path in glob(directory + '/*.sf'):
-                templateName = basename(path)[:-len('.sf')]
-                self.loadTemplateModule(templateName)
+        self._imports.clear()
+        self._fragmentCache.clear()
+        self._responseCache.clear()
+        snapshot = TemplateSnapshot(self._snapshot.version + 1)
+        for templateName in self._loader.templateNames():
+            snapshot.add(templateName, self._newTemplateModule(templateName))
+        self._publish(snapshot)
 
     def _initialize(self, reactor, watch):
+        self._reactor = reactor
         self._loadAllTemplates()
         if reactor is not None and watch:
-            for directory in self._directories:
+            for directory in self._loader.directories():
                 directoryWatcher = DirectoryWatcher(
                     directory,
                     self._notifyHandler,
@@ -163,42 +450,119 @@ class DynamicHtml(Observable):
     def _notifyHandler(self, event):
         if not event.name.endswith('.sf'):
             return
-        self._loadAllTemplates()
+        templateName = event.name[:-len('.sf')]
+        if self._reloadDelay is None:
+            self._reloadTemplates([templateName])
+            return
+        if self._reloadTimer is not None:
+            self._reloadStatistics['coalescedEvents'] += 1
+            self._reactor.removeTimer(self._reloadTimer)
+        self._pendingReload.add(templateName)
+        self._reloadTimer = self._reactor.addTimer(self._reloadDelay, self._reloadPending)
 
-    def _pathForTemplateName(self, name):
-        for directory in self._directories:
-            path = join(directory, '%s.sf' % name)
-            if isfile(path):
-                return path
+    def _reloadPending(self):
+        templateNames, self._pendingReload = self._pendingReload, set()
+        self._reloadTimer = None
+        self._reloadTemplates(templateNames)
+
+    def _reloadTemplates(self, templateNames):
+        t0 = time()
+        self._loader.refresh()
+        templates = self._templates
+        vanished = set(name for name in templates if self._loader.path(name) is None)
+        toReload = self._withImporters(set(templateNames) | vanished)
+        snapshot = TemplateSnapshot(self._snapshot.version + 1)
+        for templateName in set(templates) | toReload:
+            if templateName in toReload:
+                self._imports.pop(templateName, None)
+            if self._loader.path(templateName) is None:
+                continue
+            template = templates.get(templateName)
+            # Loaded modules are shared; their imports did not change, or they would be reloaded.
+            if template is None or templateName in toReload or not template._isLoaded():
+                template = self._newTemplateModule(templateName)
+            snapshot.add(templateName, template)
+        self._fragmentCache.clear()
+        self._responseCache.clear()
+        self._publish(snapshot)
+        duration = time() - t0
+        stats = self._reloadStatistics
+        stats['reloads'] += 1
+        stats['templatesReloaded'] += len(toReload)
+        stats['totalReloadTime'] += duration
+        stats['lastReloadTime'] = duration
+        stats['lastReloaded'] = sorted(toReload)
+
+    def _withImporters(self, templateNames):
+        result = set()
+        todo = list(templateNames)
+        while todo:
+            templateName = todo.pop()
+            if templateName in result:
+                continue
+            result.add(templateName)
+            todo.extend(importer for importer, imported in self._imports.items() if templateName in imported)
+        return result
+
+    def getReloadStatistics(self):
+        return dict(self._reloadStatistics)
+
+    def getFragmentCacheStatistics(self):
+        return self._fragmentCache.getStatistics()
+
+    def getResponseCacheStatistics(self):
+        return dict(self._responseCache.getStatistics(), coalesced=self._coalescedRequests, inFlight=len(self._inFlight))
+
+    def _gather(self, *generators, timeout=None):
+        return gather(self._reactor, generators, timeout=timeout)
+
+    def getMemoStatistics(self):
+        return dict(self._memoStatistics)
+
+    def getTemplateMetrics(self):
+        return self._templateMetrics.getMetrics()
+
+    def getSnapshotStatistics(self):
+        return dict(version=self._snapshot.version, templates=len(self._templates), liveSnapshots=len(self._snapshots))
 
     def loadTemplateModule(self, templateName):
-        if templateName in self._templates:
-            return
+        return self._snapshotModule(self._snapshot, templateName)
+
+    def _snapshotModule(self, snapshot, moduleName):
+        return snapshot.module(moduleName, self._newTemplateModule)
 
+    def _newTemplateModule(self, templateName):
         def load():
-            moduleGlobals = self.createGlobals()
+            moduleGlobals = self.createGlobals(templateName=templateName)
             createdLocals = {}
             try:
-                path = self._pathForTemplateName(templateName)
-                with open(path, "rb") as f:
-                    exec(compile(f.read(), path, 'exec'), moduleGlobals, createdLocals)
+                path = self._loader.path(templateName)
+                exec(self._compile(self._loader.source(templateName), path), moduleGlobals, createdLocals)
             except Exception:
-                s = escapeHtml(format_exc())
+                error = format_exc()
+                s = escapeHtml(error)
                 createdLocals['main'] = lambda *args, **kwargs: (x for x in ['<pre>', s, '</pre>'])
+                createdLocals['__error__'] = error
             moduleGlobals.update(createdLocals)
             return moduleGlobals
-        self._templates[templateName] = TemplateModule(load)
+        return TemplateModule(load)
+
+    def _compile(self, source, path):
+        if self._codeCache is None:
+            return self._compileSource(source, path)
+        return self._codeCache.compile(source, path)
 
-    def __import__(self, moduleName, globals=None, locals=None, fromlist=None, level=None):
+    def __import__(self, moduleName, globals=None, locals=None, fromlist=None, level=None, importer=None):
         if moduleName in self._allowedModules:
             return __import__(moduleName)
-        if not moduleName in self._templates:
-            # TS: Required for out-of-initial-loading-order importing of
-            #     another template (at initialize()-time).
-            self.loadTemplateModule(moduleName)
-        return self._templates[moduleName]
+        if importer is not None:
+            self._imports.setdefault(importer, set()).add(moduleName)
+        # Modules are shared between snapshots, so imports resolve against the
+        # snapshot of the request that runs them.
+        request = self._request
+        return self._snapshotModule(self._snapshot if request is None else request.snapshot, moduleName)
 
-    def _createMainGenerator(self, head, tail, scheme='', netloc='', path='', query='', Headers=None, arguments=None, **kwargs):
+    def _createMainGenerator(self, head, tail, templates, scheme='', netloc='', path='', query='', Headers=None, arguments=None, **kwargs):
         Headers = Headers or {}
         arguments = arguments or {}
         if tail == None:
@@ -206,15 +570,19 @@ class DynamicHtml(Observable):
         else:
             nextHead, nextTail = self._splitPath(tail)
             def _():
-                yield self._createMainGenerator(nextHead, nextTail, scheme=scheme, netloc=netloc, path=path, query=query, Headers=Headers, arguments=arguments, **kwargs)
+                yield self._createMainGenerator(nextHead, nextTail, templates, scheme=scheme, netloc=netloc, path=path, query=query, Headers=Headers, arguments=arguments, **kwargs)
             nextGenerator = _()
 
-        if not head in self._templates or not hasattr(self._templates[head], 'main'):
+        if not head in templates or not hasattr(templates[head], 'main'):
             raise DynamicHtmlException.notFound(head)
-        main = self._templates[head].main
+        main = templates[head].main
 
         def _():
-            yield main(scheme=scheme, netloc=netloc, path=path, query=query, Headers=Headers, arguments=arguments, pipe=nextGenerator, **kwargs)
+            generator = main(scheme=scheme, netloc=netloc, path=path, query=query, Headers=Headers, arguments=arguments, pipe=nextGenerator, **kwargs)
+            timings = self._currentTimings()
+            if timings is not None and isGenerator(generator):
+                generator = timed(generator, timings.stage(head))
+            yield generator
 
         return _()
 
@@ -224,101 +592,447 @@ class DynamicHtml(Observable):
             return normalizedPath[:normalizedPath.index('/')], normalizedPath[normalizedPath.index('/'):]
         return normalizedPath, None
 
-    def _createGenerators(self, path, not_found_originalPath=None, scheme='', **kwargs):
+    def _createGenerators(self, path, snapshot, not_found_originalPath=None, scheme='', **kwargs):
         head, tail = self._splitPath(path)
-        if not head in self._templates:
+        if not head in snapshot.templates:
             raise DynamicHtmlException.notFound(head)
         return compose(self._createMainGenerator(
-            head, tail,
+            head, tail, snapshot.templates,
             path=(not_found_originalPath if not_found_originalPath is not None else path),
             **kwargs))
 
-    @compose
     def handleRequest(self, path='', **kwargs):
+        return compose(self._handleRequest(path, [], **kwargs))
+
+    def _handleRequest(self, path, errors, **kwargs):
         path = path[len(self._prefix):]
         if path == '/' and self._indexPage:
-            newLocation = self._indexPage
-            arguments = kwargs.get('arguments', {})
-            if arguments:
-                newLocation = '%s?%s' % (newLocation, urlencode(arguments, doseq=True))
-            yield redirectTo(newLocation)
+            return self._indexRedirect(kwargs.get('arguments', {}))
+        request = self._newRequest(path)
+        # A template limits its own concurrent renders with a module level MAX_IN_FLIGHT = n.
+        limit = request.policy('MAX_IN_FLIGHT')
+        if self._maxInFlight is None and limit is None:
+            return self._measuredResponse(request, path, errors, **kwargs)
+        return self._admittedResponse(request, limit, path, errors, **kwargs)
+
+    def _indexRedirect(self, arguments):
+        newLocation = self._indexPage
+        if arguments:
+            newLocation = '%s?%s' % (newLocation, urlencode(arguments, doseq=True))
+        yield self._encode(redirectTo(newLocation))
+
+    def _admittedResponse(self, request, limit, path, errors, **kwargs):
+        head = request.head
+        if self._hasCapacity(head, limit):
+            self._enter(head)
+        else:
+            if len(self._waiting) >= self._maxQueued:
+                self._loadStatistics['shed'] += 1
+                yield self._overloaded
+                return
+            entry = (head, limit, Suspend())
+            self._waiting.append(entry)
+            stats = self._loadStatistics
+            stats['queued'] += 1
+            stats['maxQueueDepth'] = max(stats['maxQueueDepth'], len(self._waiting))
+            try:
+                yield entry[2]
+            except GeneratorExit:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                else:
+                    self._leave(head)
+                raise
+        try:
+            yield self._measuredResponse(request, path, errors, **kwargs)
+        finally:
+            self._leave(head)
+
+    def _newRequest(self, path):
+        head, tail = self._splitPath(path)
+        return _Request(self._snapshot, head)
+
+    def _currentTimings(self):
+        request = self._request
+        return None if request is None else request.timings
+
+    def _currentMemo(self):
+        request = self._request
+        if request is None:
+            return None
+        if request.memo is None:
+            request.memo = RequestMemo()
+        return request.memo
+
+    def _hasCapacity(self, head, limit):
+        return (self._maxInFlight is None or self._rendering < self._maxInFlight) and \
+            (limit is None or self._renderingPerTemplate.get(head, 0) < limit)
+
+    def _enter(self, head):
+        self._rendering += 1
+        self._renderingPerTemplate[head] = self._renderingPerTemplate.get(head, 0) + 1
+
+    def _leave(self, head):
+        self._rendering -= 1
+        count = self._renderingPerTemplate.pop(head) - 1
+        if count:
+            self._renderingPerTemplate[head] = count
+        for entry in self._waiting:
+            waitingHead, limit, suspend = entry
+            if self._hasCapacity(waitingHead, limit):
+                self._waiting.remove(entry)
+                self._enter(waitingHead)
+                suspend.resume()
+                return
+
+    def getLoadStatistics(self):
+        return dict(self._loadStatistics, inFlight=self._rendering, queueDepth=len(self._waiting))
+
+    def _measuredResponse(self, request, path, errors, **kwargs):
+        firstChunk = None
+        size = 0
+        timings = request.timings = None if self._slowRequestLog is None else RequestTimings()
+        t0 = time()
+        try:
+            response = compose(self._conditionalResponse(request, path, errors, **kwargs) if self._conditionalGet else self._cachedResponse(request, path, errors, **kwargs))
+            if self._profiler is not None and self._profiler.sample(path):
+                response = self._profiler.profile(path, response)
+            deadline = self._deadline(request)
+            if deadline is not None:
+                response = self._withDeadline(response, t0 + deadline, errors)
+            for data in response:
+                if data is Yield or callable(data):
+                    yield data
+                    continue
+                if firstChunk is None:
+                    firstChunk = time()
+                # isascii() is a flag check, so only non-ASCII str output is encoded to be counted.
+                size += len(data) if type(data) is bytes or data.isascii() else len(data.encode('utf-8'))
+                yield data
+        except GeneratorExit:
+            self._cancelledRenders['disconnected'] += 1
+            response.close()
+            raise
+        finally:
+            t1 = time()
+            if request.template is not None:
+                self._templateMetrics.record(request.head, (firstChunk or t1) - t0, t1 - t0, size, len(errors))
+            if timings is not None:
+                self._slowRequestLog.requestDone(path, kwargs.get('arguments'), t1 - t0, timings)
+            memo = request.memo
+            if memo is not None:
+                stats = self._memoStatistics
+                stats['hits'] += memo.hits
+                stats['misses'] += memo.misses
+                stats['uncacheable'] += memo.uncacheable
+
+    def _deadline(self, request):
+        # A template overrides the global deadline with a module level DEADLINE = seconds.
+        deadline = request.policy('DEADLINE')
+        return self._renderDeadline if deadline is None else deadline
+
+    def _withDeadline(self, response, deadline, errors):
+        started = False
+        try:
+            for data in response:
+                if data is not Yield and callable(data):
+                    data = _DeadlineGuard(data, deadline)
+                    yield data
+                    if not data.expired:
+                        continue
+                elif time() < deadline:
+                    started = started or data is not Yield
+                    yield data
+                    continue
+                break
+            else:
+                return
+        finally:
+            response.close()
+        errors.append(RenderDeadlineExceeded())
+        self._cancelledRenders['deadlineExceeded'] += 1
+        if not started:
+            yield self._encode(DEADLINE_EXCEEDED)
+
+    def getCancelledRenders(self):
+        return dict(self._cancelledRenders)
+
+    def _cachedResponse(self, request, path, errors, **kwargs):
+        cacheKey, ttl = self._responseCachePolicy(request, path, kwargs)
+        if cacheKey is None:
+            return self._renderResponse(request, path, errors, **kwargs)
+        return self._cachingResponse(request, cacheKey, ttl, path, errors, **kwargs)
+
+    def _cachingResponse(self, request, cacheKey, ttl, path, errors, **kwargs):
+        response = self._responseCache.get(cacheKey)
+        if response is None and cacheKey in self._inFlight:
+            suspend = Suspend()
+            waiters = self._inFlight[cacheKey]
+            waiters.append(suspend)
+            self._coalescedRequests += 1
+            try:
+                yield suspend
+            except GeneratorExit:
+                if suspend in waiters:
+                    waiters.remove(suspend)
+                raise
+            response = suspend.getResult()
+        if response is not None:
+            for data in response:
+                yield data
             return
+        waiters = None
+        if self._singleFlight and cacheKey not in self._inFlight:
+            waiters = self._inFlight[cacheKey] = []
+        parts = []
+        try:
+            for data in compose(self._renderResponse(request, path, errors, **kwargs)):
+                if not (data is Yield or callable(data)):
+                    parts.append(data)
+                yield data
+            if not errors and parts and _isOkStatusLine(parts[0]) and request.snapshot is self._snapshot and _isStorable(parts):
+                response = tuple(parts)
+                size = sum(len(part.encode('utf-8') if type(part) is str else part) for part in parts)
+                self._responseCache.put(cacheKey, response, size, ttl=ttl)
+        finally:
+            if waiters is not None:
+                # Waiters get None when this render failed or was closed; they render themselves.
+                del self._inFlight[cacheKey]
+                for suspend in waiters:
+                    suspend.resume(response)
 
+    def _conditionalResponse(self, request, path, errors, **kwargs):
+        method = kwargs.get('Method', 'GET')
+        if method not in ('GET', 'HEAD'):
+            yield self._cachedResponse(request, path, errors, **kwargs)
+            return
+        Headers = kwargs.get('Headers')
+        try:
+            validators = self._validators(request, path, kwargs)
+        except Exception as e:
+            errors.append(e)
+            s = format_exc() #cannot be inlined
+            if self._errorHandlingHook:
+                response = self._errorHandlingHook(s, path, **kwargs)
+                if not response is None:
+                    yield self._encode(response)
+                    return
+            yield self._encode('HTTP/1.0 500 Internal Server Error\r\n\r\n')
+            yield self._encode(str(s))
+            return
+        if validators and _notModified(Headers, validators):
+            yield self._encode(_notModifiedResponse(validators))
+            return
+        strong = method == 'GET' and not validators
+        reader = HeaderReader()
+        header = None
+        body = []
+        bodySize = 0
+        response = compose(self._cachedResponse(request, path, errors, **kwargs))
+        try:
+            for data in response:
+                if data is Yield or callable(data):
+                    yield data
+                    continue
+                if header is None:
+                    result = reader.feed(data)
+                    if result is None:
+                        continue
+                    header, rest = result
+                    if statusCode(header) != '200':
+                        strong = False
+                    elif not strong:
+                        header = addHeaders(header, validators)
+                    if not strong:
+                        yield self._encode(reader.restore(header))
+                        if method == 'HEAD':
+                            return
+                    data = rest
+                    if not data:
+                        continue
+                if strong:
+                    # Bodies too large to buffer are streamed without an ETag.
+                    body.append(data)
+                    bodySize += len(data)
+                    if bodySize <= self._strongETagMaxSize:
+                        continue
+                    strong = False
+                    yield self._encode(reader.restore(header))
+                    for data in body:
+                        yield data
+                    body = None
+                elif method != 'HEAD':
+                    yield data
+        finally:
+            response.close()
+        if header is None:
+            yield self._encode(reader.restore(reader.pending()))
+            return
+        if not strong:
+            return
+        digest = sha1()
+        for data in body:
+            digest.update(data.encode('utf-8') if type(data) is str else data)
+        validators = [('ETag', '"%s"' % digest.hexdigest())]
+        if _notModified(Headers, validators):
+            yield self._encode(_notModifiedResponse(validators))
+            return
+        yield self._encode(reader.restore(addHeaders(header, validators)))
+        for data in body:
+            yield data
+
+    def _encode(self, data):
+        # With outputBytes everything DynamicHtml emits is bytes, including
+        # error pages and what errorHandlingHook returns.
+        if not self._outputBytes or type(data) is bytes:
+            return data
+        if type(data) is str:
+            return data.encode('utf-8')
+        if isGenerator(data):
+            return (self._encode(item) for item in compose(data))
+        return data
+
+    def _validators(self, request, path, kwargs):
+        # A template opts in to cheap validators with a module level
+        # VALIDATORS = dict(version=..., lastModified=...), both called with the request kwargs.
+        policy = request.policy('VALIDATORS')
+        if not policy:
+            return []
+        validators = []
+        if 'version' in policy:
+            validators.append(('ETag', 'W/"%s"' % policy['version'](path=path, **kwargs)))
+        if 'lastModified' in policy:
+            validators.append(('Last-Modified', formatdate(policy['lastModified'](path=path, **kwargs), usegmt=True)))
+        return validators
+
+    def _responseCachePolicy(self, request, path, kwargs):
+        # A template opts in with a module level CACHE = dict(ttl=..., vary=[...]).
+        # Vary names are looked up in the request kwargs first, then in the arguments.
+        if kwargs.get('Method', 'GET') != 'GET':
+            return None, None
+        policy = request.policy('CACHE')
+        if not policy:
+            return None, None
+        arguments = kwargs.get('arguments') or {}
+        key = (path,) + tuple(
+                _freeze(kwargs[name] if name in kwargs else arguments.get(name))
+                for name in policy.get('vary', []))
+        return key, policy.get('ttl')
+
+    def _renderResponse(self, request, path, errors, **kwargs):
         tag = TagFactory()
         kwargs.update(tag=tag)
-
+        snapshot = request.snapshot
+        # Template code runs with its request installed; every yield hands it back.
+        previous, self._request = self._request, request
         try:
-            generators = self._createGenerators(path, **kwargs)
+            generators = self._createGenerators(path, snapshot, **kwargs)
         except DynamicHtmlException as e:
+            errors.append(e)
             if self._notFoundPage is None:
-                yield e.httpHeader()
-                yield str(e)
+                self._request = previous
+                yield self._encode(e.httpHeader())
+                yield self._encode(str(e))
                 return
             try:
-                generators = self._createGenerators(self._notFoundPage, not_found_originalPath=path, **kwargs)
+                generators = self._createGenerators(self._notFoundPage, snapshot, not_found_originalPath=path, **kwargs)
             except DynamicHtmlException as innerException:
-                yield innerException.httpHeader()
-                yield str(innerException)
+                self._request = previous
+                errors.append(innerException)
+                yield self._encode(innerException.httpHeader())
+                yield self._encode(str(innerException))
                 return
         except Exception as e:
+            self._request = previous
+            errors.append(e)
             if self._errorHandlingHook:
                 s = format_exc() #cannot be inlined
                 response = self._errorHandlingHook(s, path, **kwargs)
                 if not response is None:
-                    yield response
+                    yield self._encode(response)
                     return
             raise e
 
+        okHtml, okXml = (OK_HTML_BYTES, OK_XML_BYTES) if self._outputBytes else (OK_HTML, OK_XML)
         while True:
             try:
                 firstValue = next(generators)
                 if firstValue is Yield or callable(firstValue):
+                    self._request = previous
                     yield firstValue
+                    previous, self._request = self._request, request
                     continue
-                if not (type(firstValue) in [str, bytes] and ensureBytes(firstValue).startswith(b'HTTP/1.')):
-                    contentType = 'text/html'
-                    if path.endswith('.xml'):
-                        contentType = 'text/xml'
-                    yield 'HTTP/1.0 200 OK\r\nContent-Type: %s; charset=utf-8\r\n\r\n' % contentType
-                yield tag.lines()
-                yield tag.escape(firstValue)
+                if not _isStatusLine(firstValue):
+                    self._request = previous
+                    yield okXml if path.endswith('.xml') else okHtml
+                    previous, self._request = self._request, request
+                tag.write(tag.escape(firstValue))
                 break
             except DynamicHtmlException as dhe:
+                self._request = previous
+                errors.append(dhe)
                 s = format_exc() #cannot be inlined
-                yield dhe.httpHeader()
-                yield str(s)
+                yield self._encode(dhe.httpHeader())
+                yield self._encode(str(s))
                 return
-            except Exception:
+            except Exception as e:
+                self._request = previous
+                errors.append(e)
                 s = format_exc() #cannot be inlined
                 if self._errorHandlingHook:
                     response = self._errorHandlingHook(s, path, **kwargs)
                     if not response is None:
-                        yield response
+                        yield self._encode(response)
                         return
-                yield 'HTTP/1.0 500 Internal Server Error\r\n\r\n'
-                yield str(s)
+                yield self._encode('HTTP/1.0 500 Internal Server Error\r\n\r\n')
+                yield self._encode(str(s))
                 return
 
+        stream = tag.stream
+        write = stream.write
+        flush = tag.flushBytes if self._outputBytes else tag.flush
+        chunkSize = self._chunkSize
         try:
             for line in generators:
-                yield tag.lines()
-                yield line if line is Yield or callable(line) or type(line) is bytes else tag.escape(line)
-            yield tag.lines()
-        except Exception:
+                lineType = type(line)
+                if lineType is str:
+                    write(escapeHtml(line) if tag._count else line)
+                    if stream.tell() >= chunkSize:
+                        self._request = previous
+                        yield flush()
+                        previous, self._request = self._request, request
+                    continue
+                if line is Yield or callable(line) or lineType is bytes:
+                    self._request = previous
+                    if stream.tell():
+                        yield flush()
+                    yield line
+                    previous, self._request = self._request, request
+                    continue
+                write(tag.escape(line))
+            self._request = previous
+            if stream.tell():
+                yield flush()
+        except Exception as e:
+            self._request = previous
+            errors.append(e)
             s = format_exc() #cannot be inlined
+            if stream.tell():
+                yield flush()
             if self._errorHandlingHook:
                 response = self._errorHandlingHook(s, path, **kwargs)
                 if not response is None:
-                    yield response
+                    yield self._encode(response)
                     return
-            yield "<pre>"
-            yield escapeHtml(s)
-            yield "</pre>"
+            yield self._encode("<pre>")
+            yield self._encode(escapeHtml(s))
+            yield self._encode("</pre>")
 
     def getModule(self, name):
         return self._templates.get(name)
 
-    def createGlobals(self):
+    def createGlobals(self, templateName=None):
+        _import = partial(self.__import__, importer=templateName)
         result = self._additionalGlobals.copy()
         result.update({
             # Allow class creaton
@@ -326,8 +1040,8 @@ class DynamicHtml(Observable):
             '__name__': '__dynamichtml__',
         })
         result['__builtins__'] = {
-            '__import__': self.__import__,
-            'importTemplate': lambda templateName: self.__import__(templateName),
+            '__import__': _import,
+            'importTemplate': lambda name: _import(name),
 
             # standard Python stuff
             'Ellipsis': Ellipsis,
@@ -416,8 +1130,13 @@ class DynamicHtml(Observable):
             # observables proxy
             'observable': self._observableProxy,
             'NoneOfTheObserversRespond': NoneOfTheObserversRespond,
+            'GatherTimeout': GatherTimeout,
+            'offload': self._offload,
+            'OffloadQueueFull': OffloadQueueFull,
 
             'tag_compose': tag_compose,
+            '__statictag__': statictag,
+            'cached': self._fragmentCache.cached,
 
             # commonly used/needed methods
             'escapeHtml': escapeHtml,
@@ -0,0 +1,71 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from weightless.core import compose, Yield
+
+from ._html._tag import AsIs
+from .lrucache import LruCache
+
+class FragmentCache(LruCache):
+    def cached(self, key, fragment, tag, ttl=None, maxSize=None):
+        value = self.get(key)
+        if value is not None:
+            if value:
+                yield AsIs(value)
+            return
+        if callable(fragment):
+            fragment = fragment()
+        stream = tag.stream
+        write = stream.write
+        start = stream.tell()
+        parts = []
+        for line in compose(fragment):
+            if line is Yield or callable(line):
+                part = _takeFrom(stream, start)
+                if part:
+                    parts.append(part)
+                    yield AsIs(part)
+                yield line
+                start = stream.tell()
+                continue
+            write(str(line, encoding='utf-8') if type(line) is bytes else tag.escape(line))
+        part = _takeFrom(stream, start)
+        if part:
+            parts.append(part)
+            yield AsIs(part)
+        self.put(key, ''.join(parts), ttl=ttl, maxSize=maxSize)
+
+    def put(self, key, value, ttl=None, maxSize=None):
+        size = len(value.encode('utf-8'))
+        if maxSize is not None and size > maxSize:
+            return
+        LruCache.put(self, key, value, size, ttl=ttl)
+
+def _takeFrom(stream, start):
+    stream.seek(start)
+    part = stream.read()
+    stream.seek(start)
+    stream.truncate()
+    return part
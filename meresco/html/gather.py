@@ -0,0 +1,112 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from weightless.core import compose, Yield
+from weightless.io import Suspend
+
+class GatherTimeout(Exception):
+    def __init__(self, results):
+        Exception.__init__(self, 'Timeout while gathering results')
+        self.results = results
+
+def gather(reactor, generators, timeout=None):
+    # Usage in a template: results = yield observable.gather(observable.any.a(), observable.any.b(), timeout=2.0)
+    if not generators:
+        return []
+    if reactor is None:
+        results = []
+        for generator in generators:
+            results.append((yield generator))
+        return results
+    gathering = _Gathering(reactor, generators, timeout)
+    suspend = Suspend(doNext=gathering.start)
+    yield suspend
+    error = suspend.getResult()
+    if error is not None:
+        raise error
+    return gathering.results
+
+
+class _Gathering(object):
+    # Every generator runs as a reactor process of its own, so a callable it
+    # yields suspends that process only, not the request.
+    def __init__(self, reactor, generators, timeout):
+        self._reactor = reactor
+        self._generators = [compose(generator) for generator in generators]
+        self._timeout = timeout
+        self._timer = None
+        self._suspend = None
+        self._pending = len(generators)
+        self._done = False
+        self.results = [None] * len(generators)
+
+    def start(self, suspend):
+        self._suspend = suspend
+        for index, generator in enumerate(self._generators):
+            self._reactor.addProcess(self._stepper(index, generator))
+        if self._timeout is not None:
+            self._timer = self._reactor.addTimer(self._timeout, self._timedOut)
+
+    def _stepper(self, index, generator):
+        reactor = self._reactor
+        def step():
+            if self._done:
+                reactor.removeProcess(step)
+                return
+            try:
+                data = next(generator)
+            except StopIteration as e:
+                reactor.removeProcess(step)
+                self.results[index] = e.value
+                self._pending -= 1
+                if self._pending == 0:
+                    self._finish(None)
+                return
+            except Exception as e:
+                reactor.removeProcess(step)
+                self._finish(e)
+                return
+            if callable(data):
+                data(reactor, lambda: reactor.resumeProcess(step))
+            elif data is not Yield:
+                reactor.removeProcess(step)
+                self._finish(ValueError('gather expects generators that only return a value, got %r' % (data,)))
+        return step
+
+    def _timedOut(self):
+        self._timer = None
+        self._finish(GatherTimeout(list(self.results)))
+
+    def _finish(self, error):
+        if self._done:
+            return
+        self._done = True
+        if self._timer is not None:
+            self._reactor.removeTimer(self._timer)
+            self._timer = None
+        for generator in self._generators:
+            generator.close()
+        self._suspend.resume(error)
@@ -0,0 +1,109 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from meresco.core import Observable
+from meresco.components.http.utils import ensureBytes
+from weightless.core import compose, Yield
+
+from .responseheaders import HeaderReader, addHeaders, removeHeaders, headerValue, statusCode
+
+class Http11Output(Observable):
+    def __init__(self, maxBufferSize=64 * 1024, **kwargs):
+        Observable.__init__(self, **kwargs)
+        self._maxBufferSize = maxBufferSize
+
+    @compose
+    def handleRequest(self, *args, **kwargs):
+        if kwargs.get('HTTPVersion') != '1.1':
+            yield self.all.handleRequest(*args, **kwargs)
+            return
+        withoutBody = kwargs.get('Method') == 'HEAD'
+        reader = HeaderReader()
+        header = None
+        passThrough = False
+        chunked = False
+        buffer = []
+        size = 0
+        for data in compose(self.all.handleRequest(*args, **kwargs)):
+            if data is Yield or callable(data):
+                # Whatever is buffered goes out before the response waits.
+                if header is None:
+                    if reader.pending():
+                        header = reader.pending()
+                        passThrough = True
+                        yield reader.encode(header)
+                elif not (passThrough or chunked):
+                    chunked = True
+                    yield reader.encode(addHeaders(header, [('Transfer-Encoding', 'chunked')]))
+                    if buffer:
+                        yield _chunk(b''.join(buffer))
+                    buffer = None
+                yield data
+                continue
+            if header is None:
+                result = reader.feed(data)
+                if result is None:
+                    continue
+                header, data = result
+                if header.startswith('HTTP/1.0 '):
+                    header = 'HTTP/1.1 ' + header[len('HTTP/1.0 '):]
+                # The server closes the connection after every response.
+                header = addHeaders(removeHeaders(header, ['Connection']), [('Connection', 'close')])
+                if withoutBody or not self._framable(header):
+                    passThrough = True
+                    yield reader.encode(header)
+            data = ensureBytes(data)
+            if not data:
+                continue
+            if passThrough:
+                yield data
+            elif chunked:
+                yield _chunk(data)
+            else:
+                buffer.append(data)
+                size += len(data)
+                if size > self._maxBufferSize:
+                    chunked = True
+                    yield reader.encode(addHeaders(header, [('Transfer-Encoding', 'chunked')]))
+                    yield _chunk(b''.join(buffer))
+                    buffer = None
+        if header is None:
+            if reader.pending():
+                yield reader.encode(reader.pending())
+        elif chunked:
+            yield b'0\r\n\r\n'
+        elif not passThrough:
+            yield reader.encode(addHeaders(header, [('Content-Length', size)]))
+            if buffer:
+                yield b''.join(buffer)
+
+    def _framable(self, header):
+        code = statusCode(header)
+        return not (code.startswith('1') or code in ('204', '304')) and \
+            headerValue(header, 'Content-Length') is None and \
+            headerValue(header, 'Transfer-Encoding') is None
+
+def _chunk(data):
+    return b'%x\r\n%s\r\n' % (len(data), data)
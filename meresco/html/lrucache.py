@@ -0,0 +1,77 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from collections import OrderedDict
+from time import time
+
+class LruCache(object):
+    def __init__(self, maxEntries=1000, maxBytes=10 * 1024 * 1024):
+        self._maxEntries = maxEntries
+        self._maxBytes = maxBytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._now = time
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, size, expires = entry
+            if expires is None or expires > self._now():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            self._remove(key)
+        self._misses += 1
+        return None
+
+    def put(self, key, value, size, ttl=None):
+        if size > self._maxBytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, None if ttl is None else self._now() + ttl)
+        self._bytes += size
+        while len(self._entries) > self._maxEntries or self._bytes > self._maxBytes:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def getStatistics(self):
+        return dict(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            bytes=self._bytes)
+
+    def _remove(self, key):
+        value, size, expires = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,123 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from concurrent.futures import ThreadPoolExecutor
+from os import pipe, fdopen, write, close
+from queue import SimpleQueue
+from time import time
+
+from weightless.io import Suspend
+
+class OffloadQueueFull(Exception):
+    pass
+
+class Offloader(object):
+    # Usage in a template: result = yield offload(parse, filename)
+    # Workers never touch the reactor or a Suspend; finished calls are queued
+    # and a byte on a pipe wakes up the reactor to resume the templates.
+    def __init__(self, reactor, maxWorkers=4, maxQueued=100):
+        self._reactor = reactor
+        self._maxWorkers = maxWorkers
+        self._maxQueued = maxQueued
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='offload')
+        self._finished = SimpleQueue()
+        self._pending = 0
+        self._rejected = 0
+        self._calls = {}
+        self._abandoned = set()
+        readFd, self._wakeUpFd = pipe()
+        self._wakeUp = fdopen(readFd, 'rb', 0)
+        reactor.addReader(self._wakeUp, self._resume)
+
+    def offload(self, fn, *args, **kwargs):
+        if self._pending >= self._maxWorkers + self._maxQueued:
+            self._rejected += 1
+            raise OffloadQueueFull('%d calls pending' % self._pending)
+        self._pending += 1
+        suspend = Suspend()
+        future = self._executor.submit(_run, fn, args, kwargs, time())
+        future.add_done_callback(lambda future: self._done(suspend, fn, future))
+        try:
+            yield suspend
+        except GeneratorExit:
+            self._abandoned.add(suspend)
+            raise
+        result, exception = suspend.getResult()
+        if exception is not None:
+            raise exception
+        return result
+
+    def getStatistics(self):
+        return dict(
+            maxWorkers=self._maxWorkers,
+            maxQueued=self._maxQueued,
+            pending=self._pending,
+            rejected=self._rejected,
+            calls=dict((name, dict(stats)) for name, stats in self._calls.items()))
+
+    def close(self):
+        # Waits for running calls, queued calls are cancelled.
+        self._reactor.removeReader(self._wakeUp)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._wakeUp.close()
+        close(self._wakeUpFd)
+
+    def _done(self, suspend, fn, future):
+        if future.cancelled():
+            return
+        self._finished.put((suspend, fn, future.result()))
+        write(self._wakeUpFd, b'.')
+
+    def _resume(self):
+        self._wakeUp.read(4096)
+        while not self._finished.empty():
+            suspend, fn, (result, exception, submitted, started, finished) = self._finished.get()
+            self._pending -= 1
+            name = getattr(fn, '__qualname__', None) or repr(fn)
+            stats = self._calls.get(name)
+            if stats is None:
+                stats = self._calls[name] = dict(calls=0, errors=0, totalTime=0.0, maxTime=0.0, totalWaitTime=0.0)
+            stats['calls'] += 1
+            if exception is not None:
+                stats['errors'] += 1
+            stats['totalTime'] += finished - started
+            stats['maxTime'] = max(stats['maxTime'], finished - started)
+            stats['totalWaitTime'] += started - submitted
+            if suspend in self._abandoned:
+                self._abandoned.remove(suspend)
+                continue
+            suspend.resume((result, exception))
+
+def offloadInline(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+    yield
+
+def _run(fn, args, kwargs, submitted):
+    started = time()
+    try:
+        return fn(*args, **kwargs), None, submitted, started, time()
+    except Exception as e:
+        return None, e, submitted, started, time()
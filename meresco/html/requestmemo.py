@@ -0,0 +1,80 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+class RequestMemo(object):
+    def __init__(self):
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def call(self, kind, name, method, args, kwargs):
+        key = (kind, name, args, tuple(sorted(kwargs.items())))
+        try:
+            hit = key in self._results
+        except TypeError:
+            self.uncacheable += 1
+            return method(*args, **kwargs)
+        if hit:
+            self.hits += 1
+            result = self._results[key]
+            return _returning(result) if kind == 'any' else result
+        self.misses += 1
+        if kind == 'any':
+            return self._remembering(key, method(*args, **kwargs))
+        result = self._results[key] = method(*args, **kwargs)
+        return result
+
+    def _remembering(self, key, generator):
+        result = yield generator
+        self._results[key] = result
+        return result
+
+
+class MemoizedObservable(object):
+    def __init__(self, observable, currentMemo):
+        self.call = MemoizedMessages(observable.call, 'call', currentMemo)
+        self.any = MemoizedMessages(observable.any, 'any', currentMemo)
+
+
+class MemoizedMessages(object):
+    def __init__(self, messages, kind, currentMemo):
+        self._messages = messages
+        self._kind = kind
+        self._currentMemo = currentMemo
+
+    def __getattr__(self, name):
+        method = getattr(self._messages, name)
+        def memoizedMethod(*args, **kwargs):
+            memo = self._currentMemo()
+            if memo is None:
+                return method(*args, **kwargs)
+            return memo.call(self._kind, name, method, args, kwargs)
+        return memoizedMethod
+
+def _returning(value):
+    return value
+    yield
@@ -0,0 +1,90 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from cProfile import Profile
+from pstats import Stats
+from os import makedirs, remove, listdir
+from os.path import isdir, join, basename
+from seecr.zulutime import ZuluTime
+
+class RequestProfiler(object):
+    def __init__(self, directory, every=None, pathPrefixes=None, maxFiles=100):
+        self._directory = directory
+        isdir(self._directory) or makedirs(self._directory)
+        self._every = every
+        self._pathPrefixes = tuple(pathPrefixes or [])
+        self._maxFiles = maxFiles
+        self._requests = 0
+        self._nrOfProfiles = 0
+
+    def sample(self, path):
+        self._requests += 1
+        if self._pathPrefixes and path.startswith(self._pathPrefixes):
+            return True
+        return bool(self._every) and self._requests % self._every == 0
+
+    def profile(self, path, generator):
+        profile = Profile()
+        try:
+            while True:
+                profile.enable()
+                try:
+                    data = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    profile.disable()
+                yield data
+        finally:
+            generator.close()
+            self._nrOfProfiles += 1
+            profile.dump_stats(join(self._directory, self._filename(path)))
+            self._rotate()
+
+    def summary(self, top=20):
+        files = sorted(join(self._directory, f) for f in listdir(self._directory) if f.endswith('.prof'))
+        if not files:
+            return []
+        collapsed = {}
+        for (filename, line, name), (primitiveCalls, calls, totalTime, cumulativeTime, callers) in Stats(*files).stats.items():
+            if filename.endswith('.sf'):
+                location = '{}:{}'.format(basename(filename), line)
+            else:
+                location = '{}:{}({})'.format(filename, line, name)
+            entry = collapsed.setdefault(location, [0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += totalTime
+            entry[2] += cumulativeTime
+        return [dict(location=location, calls=calls, totalTime=totalTime, cumulativeTime=cumulativeTime)
+            for location, (calls, totalTime, cumulativeTime) in sorted(collapsed.items(), key=lambda item: -item[1][1])[:top]]
+
+    def _filename(self, path):
+        return '{}.{:06d}.{}.prof'.format(ZuluTime().iso8601basic(), self._nrOfProfiles, ''.join(c if c.isalnum() else '_' for c in path.strip('/'))[:64])
+
+    def _rotate(self):
+        l = [f for f in listdir(self._directory) if f.endswith('.prof')]
+        if len(l) > self._maxFiles:
+            for f in sorted(l)[:-int(self._maxFiles * 4/5)]:
+                remove(join(self._directory, f))
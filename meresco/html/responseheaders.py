@@ -0,0 +1,88 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+CRLF = '\r\n'
+
+class HeaderReader(object):
+    # Collects the status line and headers from str and/or bytes chunks.
+    # Bytes are decoded as latin-1 so character offsets equal byte offsets.
+    def __init__(self):
+        self._seen = ''
+        self._fromBytes = False
+
+    def feed(self, data):
+        if type(data) is bytes:
+            self._fromBytes = True
+            text = data.decode('latin-1')
+        else:
+            text = data
+        tail = self._seen[-3:]
+        found = (tail + text).find(CRLF + CRLF)
+        if found == -1:
+            self._seen += text
+            return None
+        end = found - len(tail) + 4
+        return self._seen + text[:end], data[end:]
+
+    def pending(self):
+        return self._seen
+
+    def restore(self, header):
+        return header.encode('latin-1') if self._fromBytes else header
+
+    def encode(self, header):
+        # Header text read from bytes goes back as it came; str is sent as UTF-8, like ensureBytes.
+        return header.encode('latin-1') if self._fromBytes else header.encode('utf-8')
+
+def statusCode(header):
+    return header[9:12]
+
+def addHeaders(header, headers):
+    return header[:-2] + ''.join('{0}: {1}{2}'.format(name, value, CRLF) for name, value in headers) + CRLF
+
+def removeHeaders(header, names):
+    names = [name.lower() for name in names]
+    lines = header[:-4].split(CRLF)
+    return CRLF.join(lines[:1] + [line for line in lines[1:] if line.partition(':')[0].strip().lower() not in names]) + CRLF + CRLF
+
+def headerValue(header, name):
+    name = name.lower()
+    for line in header[:-4].split(CRLF)[1:]:
+        key, _, value = line.partition(':')
+        if key.strip().lower() == name:
+            return value.strip()
+    return None
+
+def requestHeader(Headers, name):
+    if not Headers:
+        return None
+    value = Headers.get(name)
+    if value is not None:
+        return value
+    name = name.lower()
+    for key, value in Headers.items():
+        if key.lower() == name:
+            return value
+    return None
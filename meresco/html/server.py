@@ -35,6 +35,8 @@ from weightless.core import compose, be
 from sys import stdout
 
 from .dynamichtml import DynamicHtml
+from .coalesceoutput import CoalesceOutput
+from .http11output import Http11Output
 
 def dna(reactor, port, dynamic, static, verbose=True):
     return (Observable(),
@@ -49,7 +51,11 @@ def dna(reactor, port, dynamic, static, verbose=True):
                             )
                         ),
                         (PathFilter('/', excluding=['/static']),
-                            (DynamicHtml([dynamic], reactor=reactor, indexPage='/index'),)
+                            (Http11Output(),
+                                (CoalesceOutput(),
+                                    (DynamicHtml([dynamic], reactor=reactor, indexPage='/index'),)
+                                )
+                            )
                         )
                     )
                 )
@@ -0,0 +1,151 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from queue import Queue
+from threading import Thread
+from time import time
+
+from simplejson import dumps
+
+class SlowRequestLog(object):
+    def __init__(self, filename, threshold=1.0, maxArgumentLength=200, maxEntries=10, interval=60.0):
+        self._filename = filename
+        self.threshold = threshold
+        self._maxArgumentLength = maxArgumentLength
+        self._maxEntries = maxEntries
+        self._interval = interval
+        self._windowStart = 0.0
+        self._windowEntries = 0
+        self._logged = 0
+        self._dropped = 0
+        self._queue = Queue()
+        self._writer = None
+
+    def requestDone(self, path, arguments, totalTime, timings):
+        if totalTime < self.threshold:
+            return
+        now = time()
+        if now - self._windowStart >= self._interval:
+            self._windowStart = now
+            self._windowEntries = 0
+        if self._windowEntries >= self._maxEntries:
+            self._dropped += 1
+            return
+        self._windowEntries += 1
+        self._logged += 1
+        argumentsString = repr(arguments or {})
+        if len(argumentsString) > self._maxArgumentLength:
+            argumentsString = argumentsString[:self._maxArgumentLength] + '...'
+        self._write(dict(
+            timestamp=now,
+            path=path,
+            arguments=argumentsString,
+            totalTime=totalTime,
+            stages=[dict(template=name, time=seconds) for name, seconds in timings.stages],
+            observableTime=timings.observable[1],
+            observableCalls=timings.observableCalls,
+        ))
+
+    def getStatistics(self):
+        return dict(logged=self._logged, dropped=self._dropped)
+
+    def flush(self):
+        self._queue.join()
+
+    def _write(self, entry):
+        if self._writer is None:
+            self._writer = Thread(target=self._writeEntries, daemon=True)
+            self._writer.start()
+        self._queue.put(entry)
+
+    def _writeEntries(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                with open(self._filename, 'a') as f:
+                    f.write(dumps(entry) + '\n')
+            finally:
+                self._queue.task_done()
+
+class RequestTimings(object):
+    def __init__(self):
+        self.stages = []
+        self.observable = ['observable', 0.0]
+        self.observableCalls = 0
+
+    def stage(self, name):
+        stage = [name, 0.0]
+        self.stages.append(stage)
+        return stage
+
+class TimedMessages(object):
+    def __init__(self, messages, currentTimings):
+        self._messages = messages
+        self._currentTimings = currentTimings
+
+    def __getattr__(self, name):
+        method = getattr(self._messages, name)
+        def timedMethod(*args, **kwargs):
+            timings = self._currentTimings()
+            if timings is None:
+                return method(*args, **kwargs)
+            t0 = time()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                timings.observable[1] += time() - t0
+                timings.observableCalls += 1
+            if isGenerator(result):
+                return timed(result, timings.observable)
+            return result
+        return timedMethod
+
+def isGenerator(value):
+    return hasattr(value, 'send') and hasattr(value, 'throw')
+
+def timed(generator, slot):
+    # Adds the time spent inside generator's own steps to slot[1], passing
+    # sent values and thrown exceptions through like compose expects.
+    value = None
+    exception = None
+    while True:
+        t0 = time()
+        try:
+            data = generator.throw(exception) if exception is not None else generator.send(value)
+        except StopIteration as e:
+            slot[1] += time() - t0
+            return e.value
+        except BaseException:
+            slot[1] += time() - t0
+            raise
+        slot[1] += time() - t0
+        value = exception = None
+        try:
+            value = yield data
+        except GeneratorExit:
+            generator.close()
+            raise
+        except BaseException as e:
+            exception = e
@@ -0,0 +1,95 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from os import makedirs, stat, replace, remove, getpid
+from os.path import join, isdir, isfile
+from hashlib import sha1
+from importlib.util import MAGIC_NUMBER
+from marshal import dumps as marshalDumps, loads as marshalLoads
+from struct import Struct
+from sys import implementation
+
+# MAGIC_NUMBER changes with every Python bytecode format; mtime_ns, size
+# and sha1 of the source identify the template contents.  Sources that do
+# not live on the filesystem (archives, memory) rely on size and sha1 only.
+_HEADER = Struct('<4sqq20s')
+
+class TemplateCodeCache(object):
+    def __init__(self, directory, compileSource=None, variant=''):
+        self._directory = directory
+        self._compileSource = compileSource or (lambda source, path: compile(source, path, 'exec'))
+        self._variant = variant
+        isdir(self._directory) or makedirs(self._directory)
+        self._hits = 0
+        self._misses = 0
+
+    def compile(self, source, path):
+        mtime, size = _stamp(path, source)
+        header = _HEADER.pack(MAGIC_NUMBER, mtime, size, sha1(source).digest())
+        cacheFile = self._cacheFile(path)
+        code = self._read(cacheFile, header)
+        if code is not None:
+            self._hits += 1
+            return code
+        self._misses += 1
+        code = self._compileSource(source, path)
+        self._write(cacheFile, header + marshalDumps(code))
+        return code
+
+    def getStatistics(self):
+        return dict(hits=self._hits, misses=self._misses)
+
+    def _cacheFile(self, path):
+        return join(self._directory, '{}.{}{}.sfc'.format(sha1(path.encode('utf-8')).hexdigest(), implementation.cache_tag, self._variant))
+
+    def _read(self, cacheFile, header):
+        try:
+            with open(cacheFile, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data.startswith(header):
+            return None
+        try:
+            return marshalLoads(data[len(header):])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+    def _write(self, cacheFile, data):
+        tmpFile = '{}.{}.tmp'.format(cacheFile, getpid())
+        try:
+            with open(tmpFile, 'wb') as f:
+                f.write(data)
+            replace(tmpFile, cacheFile)
+        except OSError:
+            if isfile(tmpFile):
+                remove(tmpFile)
+
+def _stamp(path, source):
+    try:
+        st = stat(path)
+    except OSError:
+        return 0, len(source)
+    return st.st_mtime_ns, st.st_size
@@ -0,0 +1,79 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from ast import parse, NodeTransformer, Call, Name, Load, Constant, BoolOp, Or, literal_eval, copy_location, fix_missing_locations
+
+from ._html._tag import renderStaticTag
+
+_SCALARS = (str, int, float, bool, type(None))
+_RESERVED_KEYWORDS = ['html', 'tagname', '_enter_callback', '_exit_callback']
+
+def compileTemplate(source, path, foldStaticTags=False):
+    if not foldStaticTags:
+        return compile(source, path, 'exec')
+    tree = StaticTagFolder().visit(parse(source, path))
+    return compile(fix_missing_locations(tree), path, 'exec')
+
+# Rewrites "with tag(<literals>):" into
+#   "with __statictag__(tag, '<open>', '</close>') or tag(<literals>):"
+# so the original call is still made when 'tag' is not a TagFactory.
+class StaticTagFolder(NodeTransformer):
+    def visit_With(self, node):
+        self.generic_visit(node)
+        for item in node.items:
+            if item.optional_vars is None:
+                item.context_expr = self._fold(item.context_expr)
+        return node
+
+    def _fold(self, call):
+        if not self._isTagCall(call):
+            return call
+        try:
+            args = [literal_eval(arg) for arg in call.args]
+            kwargs = dict((keyword.arg, literal_eval(keyword.value)) for keyword in call.keywords)
+        except (ValueError, TypeError, SyntaxError):
+            return call
+        if not isinstance(args[0], str) or not all(_isSimpleLiteral(v) for v in kwargs.values()):
+            return call
+        try:
+            openTag, closeTag = renderStaticTag(*args, **kwargs)
+        except Exception:
+            return call
+        statictag = Call(
+            func=Name(id='__statictag__', ctx=Load()),
+            args=[Name(id='tag', ctx=Load()), Constant(value=openTag), Constant(value=closeTag)],
+            keywords=[])
+        return copy_location(BoolOp(op=Or(), values=[statictag, call]), call)
+
+    def _isTagCall(self, node):
+        return isinstance(node, Call) and \
+            isinstance(node.func, Name) and node.func.id == 'tag' and \
+            len(node.args) == 1 and \
+            all(keyword.arg is not None and keyword.arg not in _RESERVED_KEYWORDS for keyword in node.keywords)
+
+def _isSimpleLiteral(value):
+    if isinstance(value, (list, tuple)):
+        return all(isinstance(v, _SCALARS) for v in value)
+    return isinstance(value, _SCALARS)
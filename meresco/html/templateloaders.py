@@ -0,0 +1,111 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from glob import glob
+from os.path import join, basename
+from zipfile import ZipFile
+
+SUFFIX = '.sf'
+
+class FileSystemLoader(object):
+    def __init__(self, directories):
+        self._directories = list(directories)
+        self._index = {}
+        self.refresh()
+
+    def refresh(self):
+        index = {}
+        for directory in reversed(self._directories):
+            for path in glob(join(directory, '*' + SUFFIX)):
+                index[basename(path)[:-len(SUFFIX)]] = path
+        self._index = index
+
+    def directories(self):
+        return list(self._directories)
+
+    def templateNames(self):
+        return sorted(self._index)
+
+    def path(self, name):
+        return self._index.get(name)
+
+    def source(self, name):
+        with open(self._index[name], 'rb') as f:
+            return f.read()
+
+
+class ZipLoader(object):
+    def __init__(self, archive, directory=''):
+        self._archive = archive
+        self._directory = directory.strip('/')
+        self._sources = {}
+        self.refresh()
+
+    def refresh(self):
+        prefix = self._directory + '/' if self._directory else ''
+        sources = {}
+        with ZipFile(self._archive) as archive:
+            for entry in archive.namelist():
+                if not entry.startswith(prefix) or not entry.endswith(SUFFIX):
+                    continue
+                name = entry[len(prefix):-len(SUFFIX)]
+                if '/' in name:
+                    continue
+                sources[name] = (join(self._archive, entry), archive.read(entry))
+        self._sources = sources
+
+    def directories(self):
+        return []
+
+    def templateNames(self):
+        return sorted(self._sources)
+
+    def path(self, name):
+        return self._sources[name][0] if name in self._sources else None
+
+    def source(self, name):
+        return self._sources[name][1]
+
+
+class DictLoader(object):
+    def __init__(self, templates):
+        self._templates = templates
+
+    def refresh(self):
+        pass
+
+    def directories(self):
+        return []
+
+    def templateNames(self):
+        return sorted(self._templates)
+
+    def path(self, name):
+        return '<{}>/{}{}'.format(self.__class__.__name__, name, SUFFIX) if name in self._templates else None
+
+    def source(self, name):
+        source = self._templates[name]
+        return source.encode('utf-8') if type(source) is str else source
@@ -0,0 +1,100 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from bisect import bisect_left
+
+from meresco.core import Observable
+try:
+    from gustos.common.units import COUNT, TIME, MEMORY
+except ImportError:
+    COUNT, TIME, MEMORY = 'count', 'time', 'memory'
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class TemplateMetrics(object):
+    def __init__(self, buckets=BUCKETS):
+        self._buckets = tuple(buckets)
+        self._templates = {}
+
+    def record(self, templateName, firstChunkTime, renderTime, size, errors):
+        metrics = self._templates.get(templateName)
+        if metrics is None:
+            metrics = self._templates[templateName] = _Metrics(len(self._buckets) + 1)
+        metrics.requests += 1
+        if errors:
+            metrics.errors += 1
+        metrics.bytes += size
+        metrics.firstChunkTime += firstChunkTime
+        metrics.renderTime += renderTime
+        metrics.firstChunkCounts[bisect_left(self._buckets, firstChunkTime)] += 1
+        metrics.renderTimeCounts[bisect_left(self._buckets, renderTime)] += 1
+
+    def getMetrics(self):
+        return dict((templateName, dict(
+                requests=metrics.requests,
+                errors=metrics.errors,
+                bytes=metrics.bytes,
+                firstChunkTime=metrics.firstChunkTime,
+                renderTime=metrics.renderTime,
+                firstChunkHistogram=self._histogram(metrics.firstChunkCounts),
+                renderTimeHistogram=self._histogram(metrics.renderTimeCounts),
+            )) for templateName, metrics in self._templates.items())
+
+    def _histogram(self, counts):
+        return list(zip(self._buckets + (None,), counts))
+
+class _Metrics(object):
+    __slots__ = ('requests', 'errors', 'bytes', 'firstChunkTime', 'renderTime', 'firstChunkCounts', 'renderTimeCounts')
+
+    def __init__(self, nrOfBuckets):
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.firstChunkTime = 0.0
+        self.renderTime = 0.0
+        self.firstChunkCounts = [0] * nrOfBuckets
+        self.renderTimeCounts = [0] * nrOfBuckets
+
+class TemplateMetricsReport(Observable):
+    def __init__(self, name=None):
+        Observable.__init__(self, name=name)
+
+    def handleReport(self):
+        templates = {}
+        for templateName, metrics in self.call.getTemplateMetrics().items():
+            values = {
+                "requests": {COUNT: metrics['requests']},
+                "errors": {COUNT: metrics['errors']},
+                "bytes": {MEMORY: metrics['bytes']},
+                "firstChunkTime": {TIME: metrics['firstChunkTime']},
+                "renderTime": {TIME: metrics['renderTime']},
+            }
+            for key in ['firstChunkHistogram', 'renderTimeHistogram']:
+                for limit, count in metrics[key]:
+                    values["{}_{}".format(key, 'inf' if limit is None else '{:g}s'.format(limit))] = {COUNT: count}
+            templates[templateName] = values
+        self.do.report(values={self.observable_name(): {"Templates": templates}})
+        return
+        yield
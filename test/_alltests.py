@@ -46,6 +46,20 @@ from postactionstest import PostActionsTest
 from urlencodetest import UrlencodeTest
 from nextpreviteratortest import NextPrevIteratorTest
 from utilstest import UtilsTest
+from templatecodecachetest import TemplateCodeCacheTest
+from templatecompilertest import TemplateCompilerTest
+from coalesceoutputtest import CoalesceOutputTest
+from compressoutputtest import CompressOutputTest
+from http11outputtest import Http11OutputTest
+from templatemetricstest import TemplateMetricsTest
+from requestprofilertest import RequestProfilerTest
+from slowrequestlogtest import SlowRequestLogTest
+from requestmemotest import RequestMemoTest
+from gathertest import GatherTest
+from offloadtest import OffloadTest
+from fragmentcachetest import FragmentCacheTest
+from templateloaderstest import TemplateLoadersTest
+from responseheaderstest import ResponseHeadersTest
 
 from login.basichtmlloginformtest import BasicHtmlLoginFormTest
 from login.groupsfiletest import GroupsFileTest
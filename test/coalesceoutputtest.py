@@ -0,0 +1,65 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import CallTrace
+
+from weightless.core import Yield
+
+from meresco.html import CoalesceOutput, DynamicHtml
+from outputstagetestcase import OutputStageTestCase
+
+class CoalesceOutputTest(OutputStageTestCase):
+    def coalesce(self, chunkSize):
+        return self.handleRequest(CoalesceOutput(chunkSize=chunkSize), path='/')
+
+    def testCollectsIntoChunks(self):
+        self.responses = ['HTTP/1.0 200 OK\r\n\r\n', 'abc', b'def', 'g' * 10, 'h']
+        self.assertEqual([b'HTTP/1.0 200 OK\r\n\r\nabcdefgggggggggg', b'h'], self.coalesce(chunkSize=30))
+        self.assertEqual(['handleRequest'], self.observer.calledMethodNames())
+        self.assertEqual({'path': '/'}, self.observer.calledMethods[0].kwargs)
+
+    def testNothingToFlush(self):
+        self.assertEqual([], self.coalesce(chunkSize=20))
+
+    def testFlushOnYieldAndCallables(self):
+        def f():
+            pass
+        self.responses = ['a', 'b', Yield, 'c', f, f, 'd', 'é']
+        self.assertEqual([b'ab', Yield, b'c', f, f, 'dé'.encode()], self.coalesce(chunkSize=1024))
+
+    def testNestedGenerators(self):
+        def inner():
+            yield 'b'
+            yield Yield
+            yield 'c'
+        self.responses = ['a', inner(), 'd']
+        self.assertEqual([b'a', b'b', Yield, b'c', b'd'], self.coalesce(chunkSize=1))
+
+    def testDynamicHtmlChunkSize(self):
+        with open(self.tempdir + '/page.sf', 'w') as f:
+            f.write('def main(**kwargs):\n    for i in range(10):\n        yield "xxx"\n')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), chunkSize=10)
+        r = list(d.handleRequest(path='/page'))
+        self.assertEqual(['xxxxxxxxxxxx', 'xxxxxxxxxxxx', 'xxxxxx'], r[1:])
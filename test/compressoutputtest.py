@@ -0,0 +1,85 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from zlib import decompressobj, MAX_WBITS
+
+from weightless.core import Yield
+
+from meresco.html import CompressOutput
+from outputstagetestcase import OutputStageTestCase
+
+class CompressOutputTest(OutputStageTestCase):
+    def compress(self, acceptEncoding, **kwargs):
+        return self.handleRequest(CompressOutput(**kwargs), path='/', Headers={'Accept-Encoding': acceptEncoding})
+
+    def testGzip(self):
+        self.responses = ['HTTP/1.0 200 OK\r\nContent-Type: text/html\r\n\r\n', 'é' * 100, b'x' * 100]
+        result = self.compress('deflate;q=0.5, gzip', minimumSize=10)
+        self.assertEqual(b'HTTP/1.0 200 OK\r\nContent-Type: text/html\r\nContent-Encoding: gzip\r\nVary: Accept-Encoding\r\n\r\n', result[0])
+        self.assertEqual(('é' * 100).encode() + b'x' * 100, decompressobj(16 + MAX_WBITS).decompress(b''.join(result[1:])))
+
+    def testDeflateFlushesOnYield(self):
+        def f():
+            pass
+        self.responses = ['HTTP/1.0 200 OK\r\nVary: Cookie\r\n\r\nabc', Yield, 'def', f, 'ghi']
+        result = self.compress('deflate', minimumSize=1)
+        self.assertEqual(b'HTTP/1.0 200 OK\r\nContent-Encoding: deflate\r\nVary: Cookie, Accept-Encoding\r\n\r\n', result[0])
+        self.assertEqual([Yield, f], [data for data in result if type(data) is not bytes])
+        decompressor = decompressobj(MAX_WBITS)
+        self.assertEqual(b'abc', decompressor.decompress(b''.join(result[1:result.index(Yield)])))
+        self.assertEqual(b'def', decompressor.decompress(b''.join(result[result.index(Yield) + 1:result.index(f)])))
+        self.assertEqual(b'ghi', decompressor.decompress(b''.join(result[result.index(f) + 1:])))
+
+    def testBelowMinimumSizeIsSentAsIs(self):
+        self.responses = ['HTTP/1.0 200 OK\r\n', '\r\nsmall', ' body']
+        self.assertEqual([b'HTTP/1.0 200 OK\r\nVary: Accept-Encoding\r\n\r\n', b'small body'], self.compress('gzip', minimumSize=100))
+
+    def testYieldBelowMinimumSizeStartsCompressing(self):
+        self.responses = ['HTTP/1.0 200 OK\r\n', '\r\nsmall', Yield, ' body']
+        result = self.compress('gzip', minimumSize=100)
+        self.assertEqual(b'HTTP/1.0 200 OK\r\nContent-Encoding: gzip\r\nVary: Accept-Encoding\r\n\r\n', result[0])
+        decompressor = decompressobj(16 + MAX_WBITS)
+        self.assertEqual(b'small', decompressor.decompress(b''.join(result[1:result.index(Yield)])))
+        self.assertEqual(b' body', decompressor.decompress(b''.join(result[result.index(Yield) + 1:])))
+
+    def testYieldWithinHeaderSendsResponseAsIs(self):
+        self.responses = [Yield, 'HTTP/1.0 200 OK\r\n', Yield, '\r\nbody']
+        self.assertEqual([Yield, b'HTTP/1.0 200 OK\r\n', Yield, b'\r\nbody'], self.compress('gzip', minimumSize=0))
+
+    def testHeaderTextEncoding(self):
+        self.responses = ['HTTP/1.0 200 OK\r\nX-Title: é€\r\n\r\n', 'body']
+        self.assertEqual([b'HTTP/1.0 200 OK\r\nX-Title: \xc3\xa9\xe2\x82\xac\r\nVary: Accept-Encoding\r\n\r\n', b'body'], self.compress('gzip', minimumSize=100))
+        self.responses = [b'HTTP/1.0 200 OK\r\nX-Title: \xe9\r\n\r\n', 'body']
+        self.assertEqual(b'HTTP/1.0 200 OK\r\nX-Title: \xe9\r\nContent-Encoding: gzip\r\nVary: Accept-Encoding\r\n\r\n', self.compress('gzip', minimumSize=1)[0])
+
+    def testNotAccepted(self):
+        self.responses = ['HTTP/1.0 200 OK\r\n\r\n', 'body']
+        self.assertEqual([b'HTTP/1.0 200 OK\r\nVary: Accept-Encoding\r\n\r\n', b'body'], self.compress('gzip;q=0, br', minimumSize=1))
+
+    def testOnlySuccessfulUnencodedResponsesAreCompressed(self):
+        self.responses = ['HTTP/1.0 302 Found\r\nLocation: /\r\n\r\n']
+        self.assertEqual([b'HTTP/1.0 302 Found\r\nLocation: /\r\n\r\n'], self.compress('gzip', minimumSize=0))
+        self.responses = ['HTTP/1.0 200 OK\r\nContent-Encoding: br\r\n\r\n', b'data']
+        self.assertEqual([b'HTTP/1.0 200 OK\r\nContent-Encoding: br\r\n\r\n', b'data'], self.compress('gzip', minimumSize=0))
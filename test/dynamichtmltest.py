@@ -32,16 +32,26 @@
 
 from io import StringIO
 import sys
-from os import makedirs, rename, remove
+import gc
+import weakref
+from itertools import takewhile
+from time import time
+from os import makedirs, rename, remove, listdir
 from os.path import join
+from zipfile import ZipFile
 
 from seecr.test import SeecrTestCase, CallTrace
 
 from weightless.core import compose, Yield, asString
-from weightless.io import Reactor, reactor
+from weightless.io import Reactor, reactor, Suspend
 from weightless.io.utils import asProcess, sleep as zleep
 
-from meresco.html import DynamicHtml, Tag
+from meresco.html import DynamicHtml, Tag, DictLoader, ZipLoader
+from meresco.html.offload import Offloader
+
+class FileEvent(object):
+    def __init__(self, name):
+        self.name = name
 
 
 class DynamicHtmlTest(SeecrTestCase):
@@ -269,6 +279,211 @@ def main(*args, **kwargs):
         self.assertEqual([True], dos)
         self.assertEqual([True], onces)
 
+    def testMemoizedObservableCallsPerRequest(self):
+        calls = []
+        class Something(object):
+            def groups(self, username):
+                calls.append(('groups', username))
+                return ['admin']
+            def lookup(self, key, default=None):
+                calls.append(('lookup', key))
+                yield 'ignored'
+                return key.upper()
+
+        self.mktmpfl('helper.sf', """
+def isAdmin(username):
+    return 'admin' in observable.memo.call.groups(username)
+""")
+        self.mktmpfl('page.sf', """
+import helper
+def main(**kwargs):
+    yield str(helper.isAdmin('john'))
+    yield str(observable.memo.call.groups('john'))
+    yield str(observable.memo.call.groups(username='jane'))
+    yield (yield observable.memo.any.lookup('key', default=None))
+    yield (yield observable.memo.any.lookup('key', default=None))
+    yield str(observable.memo.call.groups(['unhashable']))
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        d.addObserver(Something())
+        result = asString(d.handleRequest(path='/page'))
+        self.assertTrue(result.endswith("True['admin']['admin']ignoredKEYKEY['admin']"), result)
+        self.assertEqual([('groups', 'john'), ('groups', 'jane'), ('lookup', 'key'), ('groups', ['unhashable'])], calls)
+        self.assertEqual({'hits': 2, 'misses': 3, 'uncacheable': 1}, d.getMemoStatistics())
+
+        del calls[:]
+        asString(d.handleRequest(path='/page'))
+        self.assertEqual([('groups', 'john'), ('groups', 'jane'), ('lookup', 'key'), ('groups', ['unhashable'])], calls)
+        self.assertEqual({'hits': 4, 'misses': 6, 'uncacheable': 2}, d.getMemoStatistics())
+
+    def testGatherObservableCallsConcurrently(self):
+        class Backend(object):
+            def results(self, query):
+                yield zleep(0.1)
+                return query + ' results'
+            def facets(self, query):
+                yield zleep(0.1)
+                return query + ' facets'
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    results, facets = yield observable.gather(observable.any.results('q'), observable.any.facets('q'), timeout=1.0)
+    yield results + ', ' + facets
+""")
+        def test():
+            d = DynamicHtml([self.tempdir], reactor=reactor(), watch=False)
+            d.addObserver(Backend())
+            t0 = time()
+            output = []
+            for data in d.handleRequest(path='/page'):
+                if callable(data):
+                    yield data
+                else:
+                    output.append(data)
+            self.assertTrue(time() - t0 < 0.19, time() - t0)
+            self.assertTrue(''.join(output).endswith('q results, q facets'), output)
+        asProcess(test())
+
+    def testRenderDeadlineCancelsSuspendedRender(self):
+        closed = []
+        class Backend(object):
+            def slow(self):
+                try:
+                    yield zleep(1.0)
+                    return 'slow'
+                finally:
+                    closed.append(True)
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    yield (yield observable.any.slow())
+""")
+        self.mktmpfl('streaming.sf', """
+DEADLINE = 0.05
+def main(**kwargs):
+    yield 'start'
+    yield Yield
+    yield (yield observable.any.slow())
+""")
+        def render(d, path):
+            output = []
+            for data in d.handleRequest(path=path):
+                if callable(data):
+                    yield data
+                elif data is not Yield:
+                    output.append(data)
+            return ''.join(output)
+        def test():
+            d = DynamicHtml([self.tempdir], reactor=reactor(), watch=False, renderDeadline=0.05)
+            d.addObserver(Backend())
+            t0 = time()
+            result = yield render(d, '/page')
+            self.assertTrue(time() - t0 < 0.5, time() - t0)
+            self.assertEqual('HTTP/1.0 504 Gateway Timeout\r\nContent-Type: text/plain; charset=utf-8\r\n\r\nRender deadline exceeded.', result)
+            self.assertEqual([True], closed)
+
+            d = DynamicHtml([self.tempdir], reactor=reactor(), watch=False)
+            d.addObserver(Backend())
+            result = yield render(d, '/streaming')
+            self.assertTrue(result.endswith('\r\n\r\nstart'), result)
+            self.assertEqual({'deadlineExceeded': 1, 'disconnected': 0}, d.getCancelledRenders())
+            self.assertEqual(1, d.getTemplateMetrics()['streaming']['errors'])
+        asProcess(test())
+
+    def testDisconnectClosesRender(self):
+        closed = []
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    try:
+        yield 'start'
+        yield Yield
+        yield 'end'
+    finally:
+        closed.append(True)
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), additionalGlobals={'closed': closed})
+        response = d.handleRequest(path='/page')
+        self.assertTrue(next(response).startswith('HTTP/1.0 200 OK'))
+        next(response)
+        response.close()
+        self.assertEqual([True], closed)
+        self.assertEqual({'deadlineExceeded': 0, 'disconnected': 1}, d.getCancelledRenders())
+
+    def testLoadSheddingWithBoundedQueue(self):
+        suspends = []
+        class Backend(object):
+            def wait(self):
+                suspend = Suspend()
+                suspends.append(suspend)
+                yield suspend
+                return suspend.getResult()
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    yield (yield observable.any.wait())
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), maxInFlight=1, maxQueued=1, retryAfter=5)
+        d.addObserver(Backend())
+        first = d.handleRequest(path='/page')
+        next(first)(CallTrace('Reactor'), lambda: None)
+        second = d.handleRequest(path='/page')
+        queued = next(second)
+        self.assertTrue(callable(queued))
+        queued(CallTrace('Reactor'), lambda: None)
+        self.assertEqual('HTTP/1.0 503 Service Unavailable\r\nRetry-After: 5\r\nContent-Type: text/plain; charset=utf-8\r\n\r\nService temporarily overloaded.', asString(d.handleRequest(path='/page')))
+        self.assertEqual({'inFlight': 1, 'queueDepth': 1, 'queued': 1, 'maxQueueDepth': 1, 'shed': 1}, d.getLoadStatistics())
+        self.assertEqual(1, len(suspends))
+
+        suspends[0].resume('one')
+        self.assertTrue(''.join(first).endswith('one'))
+        self.assertEqual({'inFlight': 1, 'queueDepth': 0, 'queued': 1, 'maxQueueDepth': 1, 'shed': 1}, d.getLoadStatistics())
+        next(second)(CallTrace('Reactor'), lambda: None)
+        suspends[1].resume('two')
+        self.assertTrue(''.join(second).endswith('two'))
+        self.assertEqual(0, d.getLoadStatistics()['inFlight'])
+
+    def testLoadSheddingPerTemplate(self):
+        suspends = []
+        self.mktmpfl('limited.sf', """
+MAX_IN_FLIGHT = 1
+def main(**kwargs):
+    suspend = Suspend()
+    suspends.append(suspend)
+    yield suspend
+    yield 'limited'
+""")
+        self.mktmpfl('other.sf', 'def main(**kwargs):\n    yield "other"')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), maxQueued=1, additionalGlobals={'Suspend': Suspend, 'suspends': suspends})
+        first = d.handleRequest(path='/limited')
+        next(first)(CallTrace('Reactor'), lambda: None)
+        self.assertTrue(asString(d.handleRequest(path='/other')).endswith('other'))
+        queued = d.handleRequest(path='/limited')
+        next(queued)(CallTrace('Reactor'), lambda: None)
+        self.assertTrue(asString(d.handleRequest(path='/limited')).startswith('HTTP/1.0 503'))
+        queued.close()
+        self.assertEqual({'inFlight': 1, 'queueDepth': 0, 'queued': 1, 'maxQueueDepth': 1, 'shed': 1}, d.getLoadStatistics())
+        suspends[0].resume()
+        self.assertTrue(''.join(first).endswith('limited'))
+        self.assertEqual(0, d.getLoadStatistics()['inFlight'])
+
+    def testOffloadBuiltin(self):
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    result = yield offload(sorted, [3, 1, 2], reverse=True)
+    yield str(result)
+""")
+        self.assertTrue(asString(DynamicHtml([self.tempdir], reactor=CallTrace('Reactor')).handleRequest(path='/page')).endswith('[3, 2, 1]'))
+        def test():
+            offloader = Offloader(reactor())
+            d = DynamicHtml([self.tempdir], reactor=reactor(), watch=False, offloader=offloader)
+            output = []
+            for data in d.handleRequest(path='/page'):
+                if callable(data):
+                    yield data
+                else:
+                    output.append(data)
+            offloader.close()
+            self.assertTrue(''.join(output).endswith('[3, 2, 1]'), output)
+            self.assertEqual(1, offloader.getStatistics()['calls']['sorted']['calls'])
+        asProcess(test())
+
     def testObservabilityOutsideMainOnModuleLevel(self):
         class X(object):
             def getX(*args, **kwargs):
@@ -377,7 +592,7 @@ def main(value, *args, **kwargs):
         result = ''.join(d.handleRequest(scheme='http', netloc='host.nl', path='/file2'))
         self.assertTrue('changed template word!' in result, result)
 
-    def testReloadEverythingOnAnyChangeWhenWatching(self):
+    def testReloadChangedTemplateAndImportersWhenWatching(self):
         def howOften(name):
             _anIdState = [0]
             def anId():
@@ -438,7 +653,7 @@ def using():
                 [util.reloaded, orphan.reloaded, using_util.reloaded])
             self.assertEqual('using-util-reloaded:1 - util-reloaded:1', using_util.using())
 
-            # Touch & **all** reloaded
+            # Touch & util and its importers reloaded
             with open(fp_util, 'w') as f:
                 f.write(util_contents)
             yield zleep(0.02)   # Allow DirectoryWatcher some reactor time
@@ -446,10 +661,11 @@ def using():
             util, orphan, using_util = d.getModule('util'), d.getModule('orphan'), d.getModule('using-util')
             self.assertEqual(
                 ['util-reloaded:2',
-                 'orphan-reloaded:2',
+                 'orphan-reloaded:1',
                  'using-util-reloaded:2'],
                 [util.reloaded, orphan.reloaded, using_util.reloaded])
             self.assertEqual('using-util-reloaded:2 - util-reloaded:2', using_util.using())
+            self.assertEqual(['using-util', 'util'], d.getReloadStatistics()['lastReloaded'])
 
             # Remove file - nothing happens
             remove(fp_orphan)
@@ -459,7 +675,7 @@ def using():
             self.assertNotEqual(None, orphan)
             self.assertEqual(
                 ['util-reloaded:2',
-                 'orphan-reloaded:2',
+                 'orphan-reloaded:1',
                  'using-util-reloaded:2'],
                 [util.reloaded, orphan.reloaded, using_util.reloaded])
 
@@ -481,6 +697,163 @@ def using():
 
         asProcess(test())
 
+    def testReloadFollowsImportGraph(self):
+        self.mktmpfl('c.sf', 'def main(**kwargs):\n    yield "c"')
+        self.mktmpfl('b.sf', 'import c\ndef main(**kwargs):\n    yield c.main()')
+        self.mktmpfl('a.sf', 'def main(**kwargs):\n    b = importTemplate("b")\n    yield b.main()')
+        self.mktmpfl('other.sf', 'def main(**kwargs):\n    yield "other"')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        self.assertEqual('c', asString(d.handleRequest(path='/a')).split('\r\n\r\n')[1])
+        self.assertEqual({'reloads': 0, 'templatesReloaded': 0, 'totalReloadTime': 0.0, 'lastReloadTime': 0.0, 'lastReloaded': [], 'coalescedEvents': 0}, d.getReloadStatistics())
+
+        self.mktmpfl('c.sf', 'def main(**kwargs):\n    yield "C"')
+        d._notifyHandler(FileEvent(name='c.sf'))
+        self.assertEqual(['a', 'b', 'c'], d.getReloadStatistics()['lastReloaded'])
+        self.assertEqual('C', asString(d.handleRequest(path='/a')).split('\r\n\r\n')[1])
+
+        d._notifyHandler(FileEvent(name='a.sf'))
+        self.assertEqual(['a'], d.getReloadStatistics()['lastReloaded'])
+
+        self.mktmpfl('new.sf', 'def main(**kwargs):\n    yield "new"')
+        d._notifyHandler(FileEvent(name='new.sf'))
+        self.assertEqual(['new'], d.getReloadStatistics()['lastReloaded'])
+        self.assertEqual('new', asString(d.handleRequest(path='/new')).split('\r\n\r\n')[1])
+
+        statistics = d.getReloadStatistics()
+        self.assertEqual(3, statistics['reloads'])
+        self.assertEqual(5, statistics['templatesReloaded'])
+        self.assertTrue(statistics['totalReloadTime'] >= statistics['lastReloadTime'], statistics)
+
+    def testReloadDelayBatchesEvents(self):
+        self.mktmpfl('b.sf', 'def main(**kwargs):\n    yield "b"')
+        self.mktmpfl('a.sf', 'import b\ndef main(**kwargs):\n    yield b.main()')
+        self.mktmpfl('other.sf', 'def main(**kwargs):\n    yield "other"')
+        reactor = CallTrace('Reactor', returnValues={'addTimer': 'token'})
+        d = DynamicHtml([self.tempdir], reactor=reactor, reloadDelay=0.5)
+        self.assertEqual('b', asString(d.handleRequest(path='/a')).split('\r\n\r\n')[1])
+        reactor.calledMethods.reset()
+
+        self.mktmpfl('b.sf', 'def main(**kwargs):\n    yield "B"')
+        d._notifyHandler(FileEvent(name='b.sf'))
+        d._notifyHandler(FileEvent(name='b.sf'))
+        d._notifyHandler(FileEvent(name='other.sf'))
+        d._notifyHandler(FileEvent(name='ignored.txt'))
+        self.assertEqual(['addTimer', 'removeTimer', 'addTimer', 'removeTimer', 'addTimer'], reactor.calledMethodNames())
+        self.assertEqual(0.5, reactor.calledMethods[-1].args[0])
+        self.assertEqual('token', reactor.calledMethods[-2].args[0])
+        self.assertEqual(0, d.getReloadStatistics()['reloads'])
+        self.assertEqual('b', asString(d.handleRequest(path='/a')).split('\r\n\r\n')[1])
+
+        reactor.calledMethods[-1].args[1]()
+        statistics = d.getReloadStatistics()
+        self.assertEqual(1, statistics['reloads'])
+        self.assertEqual(2, statistics['coalescedEvents'])
+        self.assertEqual(['a', 'b', 'other'], statistics['lastReloaded'])
+        self.assertEqual('B', asString(d.handleRequest(path='/a')).split('\r\n\r\n')[1])
+
+        reactor.calledMethods.reset()
+        d._notifyHandler(FileEvent(name='other.sf'))
+        self.assertEqual(['addTimer'], reactor.calledMethodNames())
+
+    def testInFlightRequestFinishesOnItsSnapshot(self):
+        self.mktmpfl('helper.sf', 'def text():\n    return "old"')
+        self.mktmpfl('tail.sf', 'def main(**kwargs):\n    yield "-tail-old"')
+        self.mktmpfl('page.sf', 'import helper\ndef main(pipe, **kwargs):\n    yield helper.text()\n    yield Yield\n    yield helper.text()\n    yield pipe')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        self.assertEqual({'version': 1, 'templates': 3, 'liveSnapshots': 1}, d.getSnapshotStatistics())
+        self.assertEqual('oldold-tail-old', asString(d.handleRequest(path='/page/tail')).split('\r\n\r\n')[1])
+        response = d.handleRequest(path='/page/tail')
+        self.assertEqual('old', ''.join(takewhile(lambda data: data is not Yield, response)).split('\r\n\r\n')[1])
+
+        oldSnapshot = weakref.ref(d._snapshot)
+        oldHelper = weakref.ref(d.getModule('helper'))
+        self.mktmpfl('helper.sf', 'def text():\n    return "new"')
+        self.mktmpfl('tail.sf', 'def main(**kwargs):\n    yield "-tail-new"')
+        d._reloadTemplates(['helper', 'tail'])
+        self.assertEqual({'version': 2, 'templates': 3, 'liveSnapshots': 2}, d.getSnapshotStatistics())
+        self.assertEqual('newnew-tail-new', asString(d.handleRequest(path='/page/tail')).split('\r\n\r\n')[1])
+
+        self.assertEqual('old-tail-old', ''.join(response))
+        del response
+        self.assertEqual(None, oldSnapshot())
+        self.assertEqual({'version': 2, 'templates': 3, 'liveSnapshots': 1}, d.getSnapshotStatistics())
+        gc.collect()
+        self.assertEqual(None, oldHelper())
+
+    def testImportsResolveInTheImportersSnapshot(self):
+        self.mktmpfl('helper.sf', 'def text():\n    return "old"')
+        self.mktmpfl('page.sf', 'def main(**kwargs):\n    yield importTemplate("helper").text()\n    yield Yield\n    yield importTemplate("helper").text()')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        response = d.handleRequest(path='/page')
+        self.assertEqual('old', ''.join(takewhile(lambda data: data is not Yield, response)).split('\r\n\r\n')[1])
+        self.mktmpfl('helper.sf', 'def text():\n    return "new"')
+        d._reloadTemplates(['helper'])
+        self.assertEqual('old', ''.join(response))
+        self.assertEqual('newnew', asString(d.handleRequest(path='/page')).split('\r\n\r\n')[1])
+
+    def testSharedModuleImportsInTheSnapshotOfTheRequest(self):
+        self.mktmpfl('helper.sf', 'def text():\n    return "old"')
+        self.mktmpfl('page.sf', 'def main(arguments, **kwargs):\n    if "helper" in arguments:\n        yield Yield\n        yield importTemplate("helper").text()\n        return\n    yield "page"')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), preloadTemplates=True)
+        d.observer_init()
+        self.assertEqual('page', asString(d.handleRequest(path='/page', arguments={})).split('\r\n\r\n')[1])
+        page = d.getModule('page')
+        response = d.handleRequest(path='/page', arguments={'helper': ['1']})
+        self.assertEqual('', ''.join(takewhile(lambda data: data is not Yield, response)))
+
+        self.mktmpfl('helper.sf', 'def text():\n    return "new"')
+        d._reloadTemplates(['helper'])
+        self.assertEqual(['helper'], d.getReloadStatistics()['lastReloaded'])
+        self.assertTrue(page is d.getModule('page'))
+        self.assertEqual({'version': 2, 'templates': 2, 'liveSnapshots': 2}, d.getSnapshotStatistics())
+        self.assertEqual('new', asString(d.handleRequest(path='/page', arguments={'helper': ['1']})).split('\r\n\r\n')[1])
+        self.assertEqual('old', ''.join(response).split('\r\n\r\n')[1])
+
+    def testImportOfUnknownTemplateIsCreatedOncePerSnapshot(self):
+        self.mktmpfl('page.sf', 'import missing\ndef main(**kwargs):\n    yield str(importTemplate("missing") is missing)')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        self.assertEqual('True', asString(d.handleRequest(path='/page')).split('\r\n\r\n')[1])
+        missing = d.loadTemplateModule('missing')
+        self.assertTrue(missing is d.loadTemplateModule('missing'))
+        self.assertTrue('missing' in missing.__error__, missing.__error__)
+        self.assertEqual(None, d.getModule('missing'))
+        self.assertTrue(d.getModule('page') is d.loadTemplateModule('page'))
+        d._reloadTemplates(['page'])
+        self.assertFalse(missing is d.loadTemplateModule('missing'))
+
+    def testSnapshotIsReadOnly(self):
+        self.mktmpfl('page.sf', 'def main(**kwargs):\n    yield "page"')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        def replace():
+            d._snapshot.templates['page'] = None
+        self.assertRaises(TypeError, replace)
+
+    def testCodeCacheDirectory(self):
+        cacheDir = join(self.tempdir, 'cache')
+        templates = join(self.tempdir, 'templates')
+        makedirs(templates)
+        with open(join(templates, 'page.sf'), 'w') as f:
+            f.write('def main(**kwargs):\n    yield "cached"')
+        for i in range(2):
+            d = DynamicHtml([templates], reactor=CallTrace('Reactor'), codeCacheDirectory=cacheDir)
+            header, body = asString(d.handleRequest(path='/page')).split('\r\n\r\n')
+            self.assertEqual('cached', body)
+        self.assertEqual({'hits': 1, 'misses': 0}, d._codeCache.getStatistics())
+        self.assertEqual(1, len(listdir(cacheDir)))
+
+    def testFoldStaticTagsUsesOwnCodeCacheEntry(self):
+        cacheDir = join(self.tempdir, 'cache')
+        templates = join(self.tempdir, 'templates')
+        makedirs(templates)
+        with open(join(templates, 'page.sf'), 'w') as f:
+            f.write('def main(tag, **kwargs):\n    with tag("p.x"):\n        yield "<folded>"')
+        for foldStaticTags in [False, True]:
+            d = DynamicHtml([templates], reactor=CallTrace('Reactor'), codeCacheDirectory=cacheDir, foldStaticTags=foldStaticTags)
+            header, body = asString(d.handleRequest(path='/page')).split('\r\n\r\n')
+            self.assertEqual('<p class="x">&lt;folded&gt;</p>', body)
+        self.assertEqual(2, len(listdir(cacheDir)))
+        self.assertEqual(1, len([f for f in listdir(cacheDir) if f.endswith('.folded.sfc')]))
+
     def testBuiltins(self):
         reactor = Reactor()
 
@@ -894,6 +1267,456 @@ def main(*args, **kwargs):
         self.assertTrue(callable(r[4]))
         self.assertEqual("text2", r[5])
 
+    def testOutputIsCoalescedBetweenSuspensions(self):
+        self.mktmpfl('page.sf', """
+def main(tag, **kwargs):
+    yield 'a'
+    with tag('p'):
+        yield '<b>'
+        yield 1
+    yield Yield
+    for i in range(3):
+        yield str(i)
+    yield b'bytes'
+    yield 'end'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        r = list(d.handleRequest(path='/page'))
+        self.assertEqual([
+                'HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n',
+                'a<p>&lt;b&gt;1</p>',
+                Yield,
+                '012',
+                b'bytes',
+                'end',
+            ], r)
+
+    def testLargeOutputIsFlushedInChunks(self):
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    for i in range(20):
+        yield 'x' * 1000
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        r = list(d.handleRequest(path='/page'))
+        self.assertEqual([9000, 9000, 2000], [len(chunk) for chunk in r[1:]])
+
+    def testOutputBeforeErrorIsKept(self):
+        self.mktmpfl('page.sf', """
+def main(tag, **kwargs):
+    yield 'before'
+    with tag('p'):
+        yield 1/0
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        r = list(d.handleRequest(path='/page'))
+        self.assertEqual('before<p></p>', r[1])
+        self.assertEqual('<pre>', r[2])
+        self.assertTrue('ZeroDivisionError' in r[3], r[3])
+
+    def testOutputBytes(self):
+        self.mktmpfl('page.sf', """
+def main(tag, **kwargs):
+    with tag('p'):
+        yield 'é<'
+    yield Yield
+    yield b'raw'
+    yield 'end'
+""")
+        self.mktmpfl('feed.xml.sf', """
+def main(**kwargs):
+    yield '<feed/>'
+""")
+        self.mktmpfl('redirect.sf', """
+def main(**kwargs):
+    yield http.redirect('/elsewhere')
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), outputBytes=True)
+        self.assertEqual([
+                b'HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n',
+                '<p>é&lt;</p>'.encode(),
+                Yield,
+                b'raw',
+                b'end',
+            ], list(d.handleRequest(path='/page')))
+        self.assertEqual([
+                b'HTTP/1.0 200 OK\r\nContent-Type: text/xml; charset=utf-8\r\n\r\n',
+                b'<feed/>',
+            ], list(d.handleRequest(path='/feed.xml')))
+        self.assertEqual([b'HTTP/1.0 302 Found\r\nLocation: /elsewhere\r\n\r\n'], list(d.handleRequest(path='/redirect')))
+
+    def testOutputBytesForErrors(self):
+        self.mktmpfl('failing.sf', """
+def main(**kwargs):
+    yield 'start'
+    yield Yield
+    raise ValueError('é')
+""")
+        self.mktmpfl('failingFirst.sf', """
+def main(**kwargs):
+    raise ValueError('é')
+    yield 'never'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), outputBytes=True, indexPage='/index')
+        def types(path):
+            return [type(data) for data in d.handleRequest(path=path) if data is not Yield]
+        self.assertEqual({bytes}, set(types('/missing')))
+        self.assertEqual({bytes}, set(types('/failing')))
+        self.assertEqual({bytes}, set(types('/failingFirst')))
+        self.assertEqual({bytes}, set(types('/')))
+        self.assertTrue("ValueError: é" in b''.join(data for data in d.handleRequest(path='/failing') if data is not Yield).decode())
+
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), outputBytes=True,
+                errorHandlingHook=lambda traceback, path, **kwargs: (x for x in ['HTTP/1.0 500 Oops\r\n\r\n', Yield, 'é']))
+        self.assertEqual([b'HTTP/1.0 500 Oops\r\n\r\n', Yield, 'é'.encode()], list(d.handleRequest(path='/failingFirst')))
+
+    def testResponseCache(self):
+        renders = []
+        def render(lang):
+            renders.append(lang)
+            return lang
+        self.mktmpfl('page.sf', """
+CACHE = dict(ttl=60, vary=['lang'])
+def main(arguments, **kwargs):
+    yield Yield
+    yield render(arguments.get('lang', ['?'])[0])
+""")
+        self.mktmpfl('other.sf', """
+def main(**kwargs):
+    yield render('other')
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), additionalGlobals={'render': render})
+        def request(path, **kwargs):
+            return [x for x in d.handleRequest(path=path, **kwargs) if x is not Yield]
+        expected = ['HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n', 'nl']
+        self.assertEqual(expected, request('/page', arguments={'lang': ['nl']}))
+        self.assertEqual(expected, request('/page', arguments={'lang': ['nl']}))
+        self.assertEqual(['nl'], renders)
+
+        request('/page', arguments={'lang': ['en']})
+        request('/page', arguments={'lang': ['en']}, Method='POST')
+        request('/other')
+        request('/other')
+        self.assertEqual(['nl', 'en', 'en', 'other', 'other'], renders)
+        self.assertEqual({'hits': 1, 'misses': 2, 'evictions': 0, 'entries': 2, 'bytes': 122, 'coalesced': 0, 'inFlight': 0}, d.getResponseCacheStatistics())
+
+        d._reloadTemplates(['other'])
+        self.assertEqual(0, d.getResponseCacheStatistics()['entries'])
+        request('/page', arguments={'lang': ['nl']})
+        self.assertEqual(['nl', 'en', 'en', 'other', 'other', 'nl'], renders)
+
+    def testResponseCacheSkipsErrors(self):
+        self.mktmpfl('page.sf', """
+CACHE = dict(vary=['arguments'])
+def main(arguments, **kwargs):
+    yield 'start'
+    if 'fail' in arguments:
+        1/0
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        for i in range(2):
+            result = asString(d.handleRequest(path='/page', arguments={'fail': ['yes']}))
+            self.assertTrue('ZeroDivisionError' in result, result)
+        self.assertEqual({'hits': 0, 'misses': 2, 'evictions': 0, 'entries': 0, 'bytes': 0, 'coalesced': 0, 'inFlight': 0}, d.getResponseCacheStatistics())
+        asString(d.handleRequest(path='/page', arguments={}))
+        asString(d.handleRequest(path='/page', arguments={}))
+        self.assertEqual(1, d.getResponseCacheStatistics()['hits'])
+
+    def testResponseCacheSkipsPrivateResponses(self):
+        self.mktmpfl('page.sf', """
+CACHE = dict(vary=['arguments'])
+def main(arguments, **kwargs):
+    yield 'HTTP/1.0 200 OK\\r\\n'
+    yield arguments['header'][0] + '\\r\\n\\r\\n'
+    yield 'body'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        for header in ['Set-Cookie: session=1', 'Cache-Control: private', 'Cache-Control: max-age=60, no-store']:
+            asString(d.handleRequest(path='/page', arguments={'header': [header]}))
+            asString(d.handleRequest(path='/page', arguments={'header': [header]}))
+        self.assertEqual({'hits': 0, 'misses': 6, 'evictions': 0, 'entries': 0, 'bytes': 0, 'coalesced': 0, 'inFlight': 0}, d.getResponseCacheStatistics())
+        asString(d.handleRequest(path='/page', arguments={'header': ['Cache-Control: public']}))
+        self.assertEqual(1, d.getResponseCacheStatistics()['entries'])
+
+    def testSingleFlightSharesOneRender(self):
+        renders = []
+        def render():
+            renders.append(True)
+            return 'two'
+        self.mktmpfl('page.sf', """
+CACHE = dict(ttl=60)
+def main(**kwargs):
+    yield 'one'
+    yield Yield
+    yield render()
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), additionalGlobals={'render': render}, singleFlight=True)
+        header = 'HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n'
+        leader = d.handleRequest(path='/page')
+        self.assertEqual([header, 'one', Yield], [next(leader), next(leader), next(leader)])
+        self.assertEqual(1, d.getResponseCacheStatistics()['inFlight'])
+
+        waiter = d.handleRequest(path='/page')
+        suspend = next(waiter)
+        self.assertEqual(Suspend, type(suspend))
+        resumed = []
+        suspend(reactor=CallTrace('reactor'), whenDone=lambda: resumed.append(True))
+
+        self.assertEqual(['two'], list(leader))
+        self.assertEqual([True], resumed)
+        self.assertEqual([header, 'one', 'two'], list(waiter))
+        self.assertEqual(1, len(renders))
+        statistics = d.getResponseCacheStatistics()
+        self.assertEqual((1, 0), (statistics['coalesced'], statistics['inFlight']))
+
+    def testSingleFlightWaiterRendersItselfWhenLeaderFails(self):
+        self.mktmpfl('page.sf', """
+CACHE = dict(vary=['arguments'])
+def main(**kwargs):
+    yield 'one'
+    yield Yield
+    yield 'two'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), singleFlight=True)
+        leader = d.handleRequest(path='/page', arguments={})
+        next(leader); next(leader); next(leader)
+        waiter = d.handleRequest(path='/page', arguments={})
+        suspend = next(waiter)
+        suspend(reactor=CallTrace('reactor'), whenDone=lambda: None)
+        leader.close()
+        self.assertEqual(0, d.getResponseCacheStatistics()['inFlight'])
+        self.assertEqual(
+            ['HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n', 'one', Yield, 'two'],
+            list(waiter))
+
+    def testSingleFlightClosedWaiterIsNotResumed(self):
+        self.mktmpfl('page.sf', """
+CACHE = dict(ttl=60)
+def main(**kwargs):
+    yield Yield
+    yield 'one'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), singleFlight=True)
+        leader = d.handleRequest(path='/page')
+        next(leader); next(leader)
+        waiter = d.handleRequest(path='/page')
+        suspend = next(waiter)
+        resumed = []
+        suspend(reactor=CallTrace('reactor'), whenDone=lambda: resumed.append(True))
+        waiter.close()
+        self.assertEqual(['one'], list(leader))
+        self.assertEqual([], resumed)
+        self.assertEqual(0, d.getResponseCacheStatistics()['inFlight'])
+
+    def testConditionalGetStrongETag(self):
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    yield Yield
+    yield 'hello'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), conditionalGet=True)
+        etag = '"aaf4c61ddcc5e8a2dabede0f3b482cd9aea9434d"'
+        result = [x for x in d.handleRequest(path='/page') if x is not Yield]
+        self.assertEqual(['HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\nETag: %s\r\n\r\n' % etag, 'hello'], result)
+        result = asString(d.handleRequest(path='/page', Headers={'If-None-Match': '"other", %s' % etag}))
+        self.assertEqual('HTTP/1.0 304 Not Modified\r\nETag: %s\r\n\r\n' % etag, result)
+        result = asString(d.handleRequest(path='/page', Headers={'if-none-match': '"other"'}))
+        self.assertTrue(result.endswith('\r\n\r\nhello'), result)
+
+    def testConditionalGetStreamsLargeBodiesWithoutETag(self):
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    yield 'abc'
+    yield Yield
+    yield 'defgh'
+    yield Yield
+    yield 'ij'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), conditionalGet=True, strongETagMaxSize=5)
+        self.assertEqual([
+                Yield,
+                'HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n',
+                'abc',
+                'defgh',
+                Yield,
+                'ij',
+            ], list(d.handleRequest(path='/page')))
+
+    def testConditionalGetValidatorErrorsGoThroughErrorHandlingHook(self):
+        self.mktmpfl('page.sf', """
+VALIDATORS = dict(version=lambda **kwargs: 1/0)
+def main(**kwargs):
+    yield 'hello'
+""")
+        hooked = []
+        def errorHandlingHook(traceback, path, **kwargs):
+            hooked.append((path, traceback))
+            return 'HTTP/1.0 503 Service Unavailable\r\n\r\n'
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), conditionalGet=True, errorHandlingHook=errorHandlingHook)
+        self.assertEqual('HTTP/1.0 503 Service Unavailable\r\n\r\n', asString(d.handleRequest(path='/page')))
+        self.assertEqual('/page', hooked[0][0])
+        self.assertTrue('ZeroDivisionError' in hooked[0][1], hooked[0][1])
+        self.assertEqual({'requests': 1, 'errors': 1}, dict((k, d.getTemplateMetrics()['page'][k]) for k in ['requests', 'errors']))
+
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), conditionalGet=True)
+        result = asString(d.handleRequest(path='/page'))
+        self.assertTrue(result.startswith('HTTP/1.0 500 Internal Server Error\r\n\r\n'), result)
+        self.assertTrue('ZeroDivisionError' in result, result)
+
+    def testConditionalGetWeakETagAndLastModifiedSkipRendering(self):
+        renders = []
+        def render():
+            renders.append(True)
+            return 'hello'
+        self.mktmpfl('page.sf', """
+VALIDATORS = dict(version=lambda arguments, **kwargs: arguments['v'][0], lastModified=lambda **kwargs: 784111777)
+def main(**kwargs):
+    yield render()
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), additionalGlobals={'render': render}, conditionalGet=True)
+        result = asString(d.handleRequest(path='/page', arguments={'v': ['1']}))
+        self.assertEqual('HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\nETag: W/"1"\r\nLast-Modified: Sun, 06 Nov 1994 08:49:37 GMT\r\n\r\nhello', result)
+        notModified = 'HTTP/1.0 304 Not Modified\r\nETag: W/"1"\r\nLast-Modified: Sun, 06 Nov 1994 08:49:37 GMT\r\n\r\n'
+        self.assertEqual(notModified, asString(d.handleRequest(path='/page', arguments={'v': ['1']}, Headers={'If-None-Match': 'W/"1"'})))
+        self.assertEqual(notModified, asString(d.handleRequest(path='/page', arguments={'v': ['1']}, Headers={'If-Modified-Since': 'Sun, 06 Nov 1994 08:49:37 GMT'})))
+        self.assertEqual(1, len(renders))
+        asString(d.handleRequest(path='/page', arguments={'v': ['2']}, Headers={'If-None-Match': 'W/"1"', 'If-Modified-Since': 'Sun, 06 Nov 1994 08:49:37 GMT'}))
+        asString(d.handleRequest(path='/page', arguments={'v': ['1']}, Headers={'If-Modified-Since': 'Sun, 06 Nov 1994 08:49:36 GMT'}))
+        self.assertEqual(3, len(renders))
+
+    def testConditionalGetHeadStopsAfterHeaders(self):
+        rendered = []
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    yield 'body'
+    rendered.append('body')
+    yield 'more'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), additionalGlobals={'rendered': rendered}, conditionalGet=True)
+        result = asString(d.handleRequest(path='/page', Method='HEAD'))
+        self.assertEqual('HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n', result)
+        self.assertEqual([], rendered)
+
+    def testConditionalGetLeavesErrorsAndOtherMethodsAlone(self):
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    yield 'hello'
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), conditionalGet=True)
+        self.assertEqual('HTTP/1.0 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\nhello', asString(d.handleRequest(path='/page', Method='POST')))
+        result = asString(d.handleRequest(path='/missing'))
+        self.assertTrue(result.startswith('HTTP/1.0 404 Not Found\r\nContent-Type: text/html; charset=utf-8\r\n\r\n'), result)
+        self.assertFalse('ETag' in result, result)
+
+    def testWarmUpPreloadsTemplatesAndRendersPaths(self):
+        rendered = []
+        self.mktmpfl('page.sf', """
+rendered.append('loaded')
+def main(arguments, **kwargs):
+    rendered.append(arguments)
+    yield 'page'
+""")
+        self.mktmpfl('broken.sf', "1/0\n")
+        self.mktmpfl('failing.sf', """
+def main(**kwargs):
+    yield 'start'
+    raise ValueError('oops')
+""")
+        hookCalls = []
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), additionalGlobals={'rendered': rendered},
+                preloadTemplates=True, warmUpPaths=['/page?a=b', '/failing'],
+                errorHandlingHook=lambda traceback, path, **kwargs: hookCalls.append((path, kwargs)))
+        self.assertEqual([], rendered)
+        self.assertEqual(None, d.getWarmUpStatistics())
+        d.observer_init()
+        self.assertEqual(['loaded', {'a': ['b']}], rendered)
+        statistics = d.getWarmUpStatistics()
+        self.assertTrue(statistics.pop('duration') >= 0)
+        self.assertEqual({'templates': 3, 'paths': 2, 'failures': ['broken', '/failing']}, statistics)
+        self.assertEqual(['/failing', 'broken', '/failing'], [path for path, kwargs in hookCalls])
+        self.assertEqual([{'warmUp': True}, {'warmUp': True}], [kwargs for path, kwargs in hookCalls[1:]])
+
+    def testWarmUpBypassesPrefixAndRequestAccounting(self):
+        closed = []
+        self.mktmpfl('page.sf', """
+def main(**kwargs):
+    yield 'page'
+""")
+        self.mktmpfl('suspending.sf', """
+def main(**kwargs):
+    try:
+        yield lambda reactor, whenDone: None
+    finally:
+        closed.append(True)
+""")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), prefix='/site', additionalGlobals={'closed': closed},
+                warmUpPaths=['/page', '/suspending'], maxInFlight=1, errorHandlingHook=lambda *args, **kwargs: None)
+        d.observer_init()
+        self.assertEqual(['/suspending'], d.getWarmUpStatistics()['failures'])
+        self.assertEqual([True], closed)
+        self.assertEqual({}, d.getTemplateMetrics())
+        self.assertEqual({'deadlineExceeded': 0, 'disconnected': 0}, d.getCancelledRenders())
+        self.assertEqual({'shed': 0, 'queued': 0, 'maxQueueDepth': 0, 'inFlight': 0, 'queueDepth': 0}, d.getLoadStatistics())
+
+    def testWarmUpFailuresLoggedToStderrWithoutHook(self):
+        self.mktmpfl('broken.sf', "1/0\n")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), preloadTemplates=True)
+        sys.stderr = StringIO()
+        try:
+            d.observer_init()
+            self.assertTrue(sys.stderr.getvalue().startswith('Warm-up of "broken" failed:\nTraceback'), sys.stderr.getvalue())
+            self.assertTrue('ZeroDivisionError' in sys.stderr.getvalue())
+        finally:
+            sys.stderr = sys.__stderr__
+
+    def testNoWarmUpByDefault(self):
+        self.mktmpfl('broken.sf', "1/0\n")
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        d.observer_init()
+        self.assertEqual(None, d.getWarmUpStatistics())
+
+    def testTemplatesFromDictLoader(self):
+        d = DynamicHtml(loader=DictLoader({
+            'page': "import helper\ndef main(**kwargs):\n    yield helper.greeting()\n",
+            'helper': "def greeting():\n    return 'hello'\n",
+        }))
+        result = asString(d.handleRequest(path='/page'))
+        self.assertTrue(result.endswith('\r\n\r\nhello'), result)
+        self.assertEqual('hello', d.getModule('helper').greeting())
+
+    def testDirectoriesOrLoader(self):
+        self.assertRaises(TypeError, lambda: DynamicHtml())
+        self.assertRaises(TypeError, lambda: DynamicHtml(self.tempdir))
+        self.assertRaises(TypeError, lambda: DynamicHtml([self.tempdir], loader=DictLoader({})))
+        self.assertRaises(TypeError, lambda: DynamicHtml([], loader=DictLoader({})))
+
+    def testTemplatesFromZipLoaderWithCodeCache(self):
+        archive = join(self.tempdir, 'templates.zip')
+        with ZipFile(archive, 'w') as z:
+            z.writestr('templates/page.sf', "def main(**kwargs):\n    yield 'zipped'\n    1/0\n")
+        d = DynamicHtml(loader=ZipLoader(archive, directory='templates'), codeCacheDirectory=join(self.tempdir, 'cache'))
+        result = asString(d.handleRequest(path='/page'))
+        self.assertTrue('zipped' in result, result)
+        self.assertTrue(join(archive, 'templates', 'page.sf') in result, result)
+
+    def testFileSystemLoaderIndexRefreshedOnReload(self):
+        first = join(self.tempdir, 'first')
+        second = join(self.tempdir, 'second')
+        makedirs(first)
+        makedirs(second)
+        with open(join(second, 'page.sf'), 'w') as f:
+            f.write("def main(**kwargs):\n    yield 'second'\n")
+        d = DynamicHtml([first, second], reactor=CallTrace('Reactor'))
+        self.assertTrue(asString(d.handleRequest(path='/page')).endswith('second'))
+        with open(join(first, 'page.sf'), 'w') as f:
+            f.write("def main(**kwargs):\n    yield 'first'\n")
+        d._reloadTemplates(['page'])
+        self.assertTrue(asString(d.handleRequest(path='/page')).endswith('first'))
+        remove(join(first, 'page.sf'))
+        remove(join(second, 'page.sf'))
+        d._reloadTemplates([])
+        self.assertEqual(None, d.getModule('page'))
+
     def testSetAttributeOnTemplateObjectNotAllowed(self):
         self.mktmpfl('two.sf', r"""
 
@@ -0,0 +1,120 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase, CallTrace
+
+from weightless.core import Yield, asString
+
+from meresco.html import DynamicHtml
+from meresco.html.fragmentcache import FragmentCache
+
+class FragmentCacheTest(SeecrTestCase):
+    def testPutAndGet(self):
+        cache = FragmentCache()
+        self.assertEqual(None, cache.get('key'))
+        cache.put('key', 'value')
+        self.assertEqual('value', cache.get('key'))
+        self.assertEqual({'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': 5}, cache.getStatistics())
+
+    def testLeastRecentlyUsedEvictedOnEntries(self):
+        cache = FragmentCache(maxEntries=2)
+        cache.put('a', 'A')
+        cache.put('b', 'B')
+        cache.get('a')
+        cache.put('c', 'C')
+        self.assertEqual(['A', None, 'C'], [cache.get(k) for k in 'abc'])
+        self.assertEqual(1, cache.getStatistics()['evictions'])
+
+    def testEvictedOnBytes(self):
+        cache = FragmentCache(maxBytes=10)
+        cache.put('a', 'é' * 3)
+        cache.put('b', 'x' * 4)
+        self.assertEqual(10, cache.getStatistics()['bytes'])
+        cache.put('c', 'y')
+        self.assertEqual([None, 'xxxx', 'y'], [cache.get(k) for k in 'abc'])
+        self.assertEqual(5, cache.getStatistics()['bytes'])
+        cache.put('d', 'z' * 11)
+        self.assertEqual(None, cache.get('d'))
+
+    def testMaxSizePerEntry(self):
+        cache = FragmentCache()
+        cache.put('a', 'xxx', maxSize=2)
+        self.assertEqual(None, cache.get('a'))
+        cache.put('a', 'xx', maxSize=2)
+        self.assertEqual('xx', cache.get('a'))
+
+    def testTimeToLive(self):
+        cache = FragmentCache()
+        cache._now = lambda: 100.0
+        cache.put('a', 'A', ttl=10)
+        cache.put('b', 'B')
+        cache._now = lambda: 109.9
+        self.assertEqual('A', cache.get('a'))
+        cache._now = lambda: 110.0
+        self.assertEqual(None, cache.get('a'))
+        self.assertEqual('B', cache.get('b'))
+        self.assertEqual({'hits': 2, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': 1}, cache.getStatistics())
+
+    def testClear(self):
+        cache = FragmentCache()
+        cache.put('a', 'A')
+        cache.clear()
+        self.assertEqual(None, cache.get('a'))
+        self.assertEqual(0, cache.getStatistics()['bytes'])
+
+    def testCachedInTemplate(self):
+        renders = []
+        def menuItems():
+            renders.append(True)
+            return ['Home & Away', 'About']
+        with open(self.tempdir + '/page.sf', 'w') as f:
+            f.write('''
+def menu(tag):
+    with tag('ul'):
+        for item in menuItems():
+            with tag('li'):
+                yield item
+    yield Yield
+
+def main(tag, **kwargs):
+    yield '<'
+    with tag('div'):
+        yield cached('menu', menu(tag), tag, ttl=60)
+        yield '>'
+''')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), additionalGlobals={'menuItems': menuItems})
+        expected = '<<div><ul><li>Home &amp; Away</li><li>About</li></ul>&gt;</div>'
+        first = list(d.handleRequest(path='/page'))
+        self.assertTrue(Yield in first, first)
+        self.assertEqual(expected, ''.join(x for x in first if x is not Yield).split('\r\n\r\n', 1)[1])
+        self.assertEqual(expected, asString(d.handleRequest(path='/page')).split('\r\n\r\n', 1)[1])
+        self.assertEqual(1, len(renders))
+        statistics = d.getFragmentCacheStatistics()
+        self.assertEqual((1, 1, 1), (statistics['hits'], statistics['misses'], statistics['entries']))
+
+        d._reloadTemplates(['page'])
+        self.assertEqual(0, d.getFragmentCacheStatistics()['entries'])
+        self.assertEqual(expected, asString(d.handleRequest(path='/page')).split('\r\n\r\n', 1)[1])
+        self.assertEqual(2, len(renders))
@@ -0,0 +1,109 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from seecr.test import SeecrTestCase
+from time import time
+
+from weightless.core import compose, Yield
+from weightless.io import reactor
+from weightless.io.utils import asProcess, sleep as zleep
+
+from meresco.html.gather import gather, GatherTimeout
+
+class GatherTest(SeecrTestCase):
+    def testRunsConcurrently(self):
+        def backend(value, delay):
+            yield zleep(delay)
+            yield Yield
+            return value
+        def test():
+            t0 = time()
+            results = yield gather(reactor(), [backend('slow', 0.1), backend('fast', 0.05), backend('slow', 0.1)])
+            self.assertEqual(['slow', 'fast', 'slow'], results)
+            self.assertTrue(time() - t0 < 0.19, time() - t0)
+        asProcess(test())
+
+    def testTimeout(self):
+        closed = []
+        def backend(value, delay):
+            try:
+                yield zleep(delay)
+                return value
+            finally:
+                closed.append(value)
+        def test():
+            try:
+                yield gather(reactor(), [backend('fast', 0.01), backend('slow', 1.0)], timeout=0.05)
+                self.fail()
+            except GatherTimeout as e:
+                self.assertEqual(['fast', None], e.results)
+            self.assertEqual(['fast', 'slow'], closed)
+        asProcess(test())
+
+    def testExceptionCancelsOthers(self):
+        closed = []
+        def failing():
+            yield zleep(0.01)
+            raise ValueError('oops')
+        def backend():
+            try:
+                yield zleep(1.0)
+            finally:
+                closed.append(True)
+        def test():
+            try:
+                yield gather(reactor(), [failing(), backend()])
+                self.fail()
+            except ValueError as e:
+                self.assertEqual('oops', str(e))
+            self.assertEqual([True], closed)
+        asProcess(test())
+
+    def testOnlyReturnValuesAllowed(self):
+        def backend():
+            yield 'data'
+        def test():
+            try:
+                yield gather(reactor(), [backend()])
+                self.fail()
+            except ValueError as e:
+                self.assertEqual("gather expects generators that only return a value, got 'data'", str(e))
+        asProcess(test())
+
+    def testWithoutReactorRunsSequentially(self):
+        def backend(value):
+            yield Yield
+            return value
+        def test():
+            results = yield gather(None, [backend('a'), backend('b')])
+            yield results
+        self.assertEqual([Yield, Yield, ['a', 'b']], list(compose(test())))
+
+    def testNothingToGather(self):
+        def test():
+            results = yield gather(reactor(), [])
+            yield results
+        self.assertEqual([[]], list(compose(test())))
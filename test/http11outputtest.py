@@ -0,0 +1,88 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from weightless.core import Yield
+
+from meresco.html import Http11Output
+from outputstagetestcase import OutputStageTestCase
+
+class Http11OutputTest(OutputStageTestCase):
+    def request(self, maxBufferSize=1024, **kwargs):
+        return self.handleRequest(Http11Output(maxBufferSize=maxBufferSize), path='/', **kwargs)
+
+    def testHttp10RequestIsUntouched(self):
+        self.responses = ['HTTP/1.0 200 OK\r\n\r\n', 'body']
+        self.assertEqual(['HTTP/1.0 200 OK\r\n\r\n', 'body'], self.request(HTTPVersion='1.0'))
+        self.assertEqual(['HTTP/1.0 200 OK\r\n\r\n', 'body'], self.request())
+
+    def testSmallResponseGetsContentLength(self):
+        self.responses = ['HTTP/1.0 200 OK\r\nContent-Type: text/plain\r\n', '\r\nbo', 'dé']
+        self.assertEqual([b'HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nConnection: close\r\nContent-Length: 5\r\n\r\n', 'bodé'.encode()], self.request(HTTPVersion='1.1'))
+
+    def testSuspendingResponseIsChunkedBeforeWaiting(self):
+        def f():
+            pass
+        self.responses = ['HTTP/1.0 200 OK\r\n\r\n', 'event 1', f, 'event 2']
+        self.assertEqual([
+                b'HTTP/1.1 200 OK\r\nConnection: close\r\nTransfer-Encoding: chunked\r\n\r\n',
+                b'7\r\nevent 1\r\n',
+                f,
+                b'7\r\nevent 2\r\n',
+                b'0\r\n\r\n',
+            ], self.request(HTTPVersion='1.1'))
+        self.responses = [Yield, 'HTTP/1.0 200 OK\r\n', Yield, '\r\nbody']
+        self.assertEqual([Yield, b'HTTP/1.0 200 OK\r\n', Yield, b'\r\nbody'], self.request(HTTPVersion='1.1'))
+
+    def testHeaderTextEncoding(self):
+        self.responses = ['HTTP/1.0 200 OK\r\nX-Title: é€\r\n\r\n']
+        self.assertEqual([b'HTTP/1.1 200 OK\r\nX-Title: \xc3\xa9\xe2\x82\xac\r\nConnection: close\r\nContent-Length: 0\r\n\r\n'], self.request(HTTPVersion='1.1'))
+        self.responses = [b'HTTP/1.0 200 OK\r\nX-Title: \xe9\r\n\r\n']
+        self.assertEqual([b'HTTP/1.1 200 OK\r\nX-Title: \xe9\r\nConnection: close\r\nContent-Length: 0\r\n\r\n'], self.request(HTTPVersion='1.1'))
+
+    def testLargeResponseIsChunked(self):
+        def f():
+            pass
+        self.responses = ['HTTP/1.0 200 OK\r\n\r\n', 'abc', 'defgh', f, 'ij']
+        self.assertEqual([
+                b'HTTP/1.1 200 OK\r\nConnection: close\r\nTransfer-Encoding: chunked\r\n\r\n',
+                b'8\r\nabcdefgh\r\n',
+                f,
+                b'2\r\nij\r\n',
+                b'0\r\n\r\n',
+            ], self.request(maxBufferSize=4, HTTPVersion='1.1'))
+
+    def testAlwaysConnectionClose(self):
+        self.responses = ['HTTP/1.0 302 Found\r\nLocation: /\r\n\r\n']
+        self.assertEqual([b'HTTP/1.1 302 Found\r\nLocation: /\r\nConnection: close\r\nContent-Length: 0\r\n\r\n'], self.request(HTTPVersion='1.1', Headers={'Connection': 'close'}))
+        self.responses = ['HTTP/1.0 200 OK\r\nConnection: keep-alive\r\n\r\n']
+        self.assertEqual([b'HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 0\r\n\r\n'], self.request(HTTPVersion='1.1', Headers={'Connection': 'keep-alive'}))
+
+    def testResponsesWithoutBodyOrFramingPassThrough(self):
+        self.responses = ['HTTP/1.0 304 Not Modified\r\n\r\n']
+        self.assertEqual([b'HTTP/1.1 304 Not Modified\r\nConnection: close\r\n\r\n'], self.request(HTTPVersion='1.1'))
+        self.responses = ['HTTP/1.0 200 OK\r\nContent-Length: 4\r\n\r\n', 'body']
+        self.assertEqual([b'HTTP/1.1 200 OK\r\nContent-Length: 4\r\nConnection: close\r\n\r\n', b'body'], self.request(HTTPVersion='1.1'))
+        self.responses = ['HTTP/1.0 200 OK\r\n\r\n']
+        self.assertEqual([b'HTTP/1.1 200 OK\r\nConnection: close\r\n\r\n'], self.request(HTTPVersion='1.1', Method='HEAD'))
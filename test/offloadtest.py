@@ -0,0 +1,99 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from seecr.test import SeecrTestCase
+from threading import current_thread, Event
+from time import sleep
+
+from weightless.core import compose
+from weightless.io import reactor
+from weightless.io.utils import asProcess
+
+from meresco.html.offload import Offloader, OffloadQueueFull, offloadInline
+
+class OffloadTest(SeecrTestCase):
+    def testRunsOffReactorThread(self):
+        def work(a, b=0):
+            return current_thread().name, a + b
+        def test():
+            offloader = Offloader(reactor())
+            try:
+                threadName, result = yield offloader.offload(work, 1, b=2)
+                self.assertEqual(3, result)
+                self.assertTrue(threadName.startswith('offload'), threadName)
+                self.assertNotEqual(current_thread().name, threadName)
+                statistics = offloader.getStatistics()
+                self.assertEqual({'maxWorkers': 4, 'maxQueued': 100, 'pending': 0, 'rejected': 0}, dict((k, v) for k, v in statistics.items() if k != 'calls'))
+                self.assertEqual(['OffloadTest.testRunsOffReactorThread.<locals>.work'], list(statistics['calls']))
+                callStatistics = statistics['calls']['OffloadTest.testRunsOffReactorThread.<locals>.work']
+                self.assertEqual((1, 0), (callStatistics['calls'], callStatistics['errors']))
+                self.assertTrue(callStatistics['totalTime'] >= 0)
+            finally:
+                offloader.close()
+        asProcess(test())
+
+    def testExceptionRaisedInGenerator(self):
+        def failing():
+            raise ValueError('oops')
+        def test():
+            offloader = Offloader(reactor())
+            try:
+                try:
+                    yield offloader.offload(failing)
+                    self.fail()
+                except ValueError as e:
+                    self.assertEqual('oops', str(e))
+                self.assertEqual(1, offloader.getStatistics()['calls']['OffloadTest.testExceptionRaisedInGenerator.<locals>.failing']['errors'])
+            finally:
+                offloader.close()
+        asProcess(test())
+
+    def testQueueFull(self):
+        release = Event()
+        def test():
+            offloader = Offloader(reactor(), maxWorkers=1, maxQueued=1)
+            try:
+                pending = [compose(offloader.offload(release.wait)) for i in range(2)]
+                for generator in pending:
+                    next(generator)
+                try:
+                    yield offloader.offload(sleep, 0)
+                    self.fail()
+                except OffloadQueueFull as e:
+                    self.assertEqual('2 calls pending', str(e))
+                self.assertEqual(1, offloader.getStatistics()['rejected'])
+                for generator in pending:
+                    generator.close()
+            finally:
+                release.set()
+                offloader.close()
+        asProcess(test())
+
+    def testInline(self):
+        def test():
+            result = yield offloadInline(lambda a: a * 2, 21)
+            yield result
+        self.assertEqual([42], list(compose(test())))
@@ -0,0 +1,49 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from seecr.test import SeecrTestCase, CallTrace
+
+from meresco.core import Observable
+from weightless.core import be, compose
+
+
+class OutputStageTestCase(SeecrTestCase):
+    def setUp(self):
+        SeecrTestCase.setUp(self)
+        self.responses = []
+        def handleRequest(**kwargs):
+            for response in self.responses:
+                yield response
+        self.observer = CallTrace(methods={'handleRequest': handleRequest})
+
+    def handleRequest(self, stage, **kwargs):
+        dna = be(
+            (Observable(),
+                (stage,
+                    (self.observer, )
+                )
+            ))
+        return list(compose(dna.all.handleRequest(**kwargs)))
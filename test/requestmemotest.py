@@ -0,0 +1,74 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from seecr.test import SeecrTestCase
+
+from weightless.core import compose
+
+from meresco.html.requestmemo import RequestMemo, MemoizedMessages
+
+class RequestMemoTest(SeecrTestCase):
+    def testCallKeyedOnNameAndArguments(self):
+        calls = []
+        def method(*args, **kwargs):
+            calls.append((args, kwargs))
+            return len(calls)
+        memo = RequestMemo()
+        self.assertEqual(1, memo.call('call', 'm', method, (1,), {'a': 2}))
+        self.assertEqual(1, memo.call('call', 'm', method, (1,), {'a': 2}))
+        self.assertEqual(2, memo.call('call', 'm', method, (1,), {'a': 3}))
+        self.assertEqual(3, memo.call('call', 'other', method, (1,), {'a': 2}))
+        self.assertEqual((1, 3, 0), (memo.hits, memo.misses, memo.uncacheable))
+
+    def testExceptionsAreNotRemembered(self):
+        calls = []
+        def method():
+            calls.append(True)
+            raise ValueError('oops')
+        memo = RequestMemo()
+        self.assertRaises(ValueError, lambda: memo.call('call', 'm', method, (), {}))
+        self.assertRaises(ValueError, lambda: memo.call('call', 'm', method, (), {}))
+        self.assertEqual(2, len(calls))
+
+    def testAnyRemembersReturnValue(self):
+        def method():
+            yield 'data'
+            return 'result'
+        memo = RequestMemo()
+        def consumer():
+            first = yield memo.call('any', 'm', method, (), {})
+            second = yield memo.call('any', 'm', method, (), {})
+            yield first + second
+        self.assertEqual(['data', 'resultresult'], list(compose(consumer())))
+        self.assertEqual((1, 1), (memo.hits, memo.misses))
+
+    def testWithoutCurrentMemoCallsThrough(self):
+        class Messages(object):
+            def m(self, value):
+                return [value]
+        messages = MemoizedMessages(Messages(), 'call', lambda: None)
+        self.assertEqual([1], messages.m(1))
+        self.assertFalse(messages.m(1) is messages.m(1))
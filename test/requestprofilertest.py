@@ -0,0 +1,61 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from os import listdir
+from os.path import join
+
+from seecr.test import SeecrTestCase, CallTrace
+
+from weightless.core import compose, Yield
+
+from meresco.html import DynamicHtml
+from meresco.html.requestprofiler import RequestProfiler
+
+class RequestProfilerTest(SeecrTestCase):
+    def testSampling(self):
+        profiler = RequestProfiler(join(self.tempdir, 'profiles'), every=3, pathPrefixes=['/slow'])
+        self.assertEqual([False, False, True, False, True, True], [profiler.sample(path) for path in ['/a', '/b', '/c', '/d', '/slow/page', '/f']])
+        self.assertEqual([False, False], [RequestProfiler(join(self.tempdir, 'other')).sample('/a') for i in range(2)])
+
+    def testProfileSampledRequestsIntoRotatedFiles(self):
+        with open(join(self.tempdir, 'page.sf'), 'w') as f:
+            f.write('def main(**kwargs):\n    yield Yield\n    yield "".join(str(i) for i in range(10))\n')
+        profiles = join(self.tempdir, 'profiles')
+        profiler = RequestProfiler(profiles, every=1, maxFiles=5)
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), profiler=profiler)
+        result = list(compose(d.handleRequest(path='/page')))
+        self.assertEqual(Yield, result[0])
+        self.assertEqual('0123456789', result[-1])
+        self.assertEqual(1, len(listdir(profiles)))
+        self.assertTrue(listdir(profiles)[0].endswith('.000001.page.prof'), listdir(profiles))
+
+        for i in range(5):
+            list(compose(d.handleRequest(path='/page')))
+        self.assertEqual(4, len(listdir(profiles)))
+
+        locations = [entry['location'] for entry in profiler.summary(top=100)]
+        self.assertTrue('page.sf:1' in locations, locations)
+        self.assertTrue('page.sf:3' in locations, locations)
+        self.assertEqual(3, len(profiler.summary(top=3)))
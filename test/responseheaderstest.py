@@ -0,0 +1,53 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+
+from meresco.html.responseheaders import HeaderReader, addHeaders, removeHeaders, headerValue, requestHeader, statusCode
+
+class ResponseHeadersTest(SeecrTestCase):
+    def testHeaderReaderAcrossStrAndBytes(self):
+        reader = HeaderReader()
+        self.assertEqual(None, reader.feed('HTTP/1.0 302 Found\r\n'))
+        self.assertEqual(None, reader.feed(b'Location: /\r\n\r'))
+        self.assertEqual(('HTTP/1.0 302 Found\r\nLocation: /\r\n\r\n', b'\xc3\xa9'), reader.feed(b'\n\xc3\xa9'))
+
+    def testHeaderReaderIncomplete(self):
+        reader = HeaderReader()
+        self.assertEqual(None, reader.feed('HTTP/1.0 200 OK\r\n'))
+        self.assertEqual('HTTP/1.0 200 OK\r\n', reader.pending())
+
+    def testEditHeaders(self):
+        header = 'HTTP/1.0 200 OK\r\nContent-Type: text/html\r\nVary: Cookie\r\n\r\n'
+        self.assertEqual('200', statusCode(header))
+        self.assertEqual('text/html', headerValue(header, 'content-type'))
+        self.assertEqual(None, headerValue(header, 'ETag'))
+        self.assertEqual('HTTP/1.0 200 OK\r\nContent-Type: text/html\r\nVary: Cookie\r\nETag: "1"\r\n\r\n', addHeaders(header, [('ETag', '"1"')]))
+        self.assertEqual('HTTP/1.0 200 OK\r\nContent-Type: text/html\r\n\r\n', removeHeaders(header, ['vary']))
+
+    def testRequestHeaderIsCaseInsensitive(self):
+        self.assertEqual('gzip', requestHeader({'accept-encoding': 'gzip'}, 'Accept-Encoding'))
+        self.assertEqual('gzip', requestHeader({'Accept-Encoding': 'gzip'}, 'Accept-Encoding'))
+        self.assertEqual(None, requestHeader(None, 'Accept-Encoding'))
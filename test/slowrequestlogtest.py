@@ -0,0 +1,97 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from os.path import join
+from time import sleep
+
+from seecr.test import SeecrTestCase, CallTrace
+from simplejson import loads
+
+from meresco.core import Observable
+from weightless.core import be, compose
+
+from meresco.html import DynamicHtml
+from meresco.html.slowrequestlog import SlowRequestLog, RequestTimings, timed
+
+class SlowRequestLogTest(SeecrTestCase):
+    def readLog(self, log):
+        log.flush()
+        with open(join(self.tempdir, 'slow.log')) as f:
+            return [loads(line) for line in f]
+
+    def testThresholdRateLimitAndTruncation(self):
+        log = SlowRequestLog(join(self.tempdir, 'slow.log'), threshold=0.5, maxArgumentLength=10, maxEntries=2)
+        log.requestDone('/fast', {}, 0.1, RequestTimings())
+        for i in range(3):
+            log.requestDone('/slow', {'q': ['x' * 20]}, 0.6, RequestTimings())
+        self.assertEqual({'logged': 2, 'dropped': 1}, log.getStatistics())
+        entries = self.readLog(log)
+        self.assertEqual(['/slow', '/slow'], [entry['path'] for entry in entries])
+        self.assertEqual("{'q': ['xx...", entries[0]['arguments'])
+        self.assertEqual(0.6, entries[0]['totalTime'])
+
+    def testTimedPassesSendAndThrow(self):
+        def inner():
+            try:
+                value = yield 'a'
+                yield value
+            except ValueError:
+                yield 'caught'
+            return 'done'
+        slot = ['inner', 0.0]
+        g = timed(inner(), slot)
+        self.assertEqual('a', next(g))
+        self.assertEqual('sent', g.send('sent'))
+        self.assertEqual('caught', g.throw(ValueError()))
+        try:
+            next(g)
+            self.fail()
+        except StopIteration as e:
+            self.assertEqual('done', e.value)
+        self.assertTrue(slot[1] > 0)
+
+    def testDynamicHtmlAttributesStagesAndObservableTime(self):
+        with open(join(self.tempdir, 'outer.sf'), 'w') as f:
+            f.write('def main(pipe, **kwargs):\n    observable.call.slow()\n    result = yield observable.any.generate()\n    yield result\n    yield pipe\n')
+        with open(join(self.tempdir, 'inner.sf'), 'w') as f:
+            f.write('def main(**kwargs):\n    yield "inner"\n')
+        def generate():
+            sleep(0.01)
+            yield 'generated'
+            return 'returned'
+        observer = CallTrace(methods={'slow': lambda: sleep(0.02), 'generate': generate})
+        log = SlowRequestLog(join(self.tempdir, 'slow.log'), threshold=0.0)
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), slowRequestLog=log)
+        top = be((Observable(), (d, (observer,))))
+        result = ''.join(compose(top.all.handleRequest(path='/outer/inner', arguments={'a': ['b']})))
+        self.assertTrue(result.endswith('generatedreturnedinner'), result)
+
+        entry, = self.readLog(log)
+        self.assertEqual('/outer/inner', entry['path'])
+        self.assertEqual("{'a': ['b']}", entry['arguments'])
+        self.assertEqual(['outer', 'inner'], [stage['template'] for stage in entry['stages']])
+        self.assertTrue(entry['stages'][0]['time'] >= 0.02, entry)
+        self.assertEqual(2, entry['observableCalls'])
+        self.assertTrue(0.03 <= entry['observableTime'] <= entry['totalTime'], entry)
@@ -280,7 +280,11 @@ class TagTest(SeecrTestCase):
 
     def processTemplate(self, template):
         with open(self.tempdir+'/afile.sf', 'w') as f: f.write('def main(tag, **kwargs):\n'+template)
-        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
-        header, body = parseResponse(asBytes(d.handleRequest(path='/afile')))
-        self.assertEqual('200', header['StatusCode'], body)
-        return body.decode()
+        bodies = []
+        for foldStaticTags in [False, True]:
+            d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'), foldStaticTags=foldStaticTags)
+            header, body = parseResponse(asBytes(d.handleRequest(path='/afile')))
+            self.assertEqual('200', header['StatusCode'], body)
+            bodies.append(body.decode())
+        self.assertEqual(bodies[0], bodies[1])
+        return bodies[0]
@@ -0,0 +1,122 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+from os import listdir, utime, stat
+from os.path import join
+
+from meresco.html import templatecodecache
+from meresco.html.templatecodecache import TemplateCodeCache
+
+class TemplateCodeCacheTest(SeecrTestCase):
+    def setUp(self):
+        SeecrTestCase.setUp(self)
+        self.cacheDir = join(self.tempdir, 'cache')
+        self.path = join(self.tempdir, 'page.sf')
+        self.writeTemplate('x = 42\n')
+
+    def writeTemplate(self, contents):
+        with open(self.path, 'w') as f:
+            f.write(contents)
+
+    def compile(self, cache):
+        with open(self.path, 'rb') as f:
+            code = cache.compile(f.read(), self.path)
+        result = {}
+        exec(code, result)
+        return result['x']
+
+    def testCompileStoresCodeInCache(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        self.assertEqual(42, self.compile(cache))
+        self.assertEqual({'hits': 0, 'misses': 1}, cache.getStatistics())
+        files = listdir(self.cacheDir)
+        self.assertEqual(1, len(files))
+        self.assertTrue(files[0].endswith('.sfc'), files)
+
+        cache = TemplateCodeCache(self.cacheDir)
+        self.assertEqual(42, self.compile(cache))
+        self.assertEqual({'hits': 1, 'misses': 0}, cache.getStatistics())
+
+    def testCodeKeepsTemplatePathAsFilename(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        with open(self.path, 'rb') as f:
+            source = f.read()
+        cache.compile(source, self.path)
+        self.assertEqual(self.path, cache.compile(source, self.path).co_filename)
+
+    def testSourceWithoutFile(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        path = join(self.tempdir, 'templates.zip', 'page.sf')
+        self.assertEqual(path, cache.compile(b'x = 42\n', path).co_filename)
+        cache.compile(b'x = 42\n', path)
+        cache.compile(b'x = 43\n', path)
+        self.assertEqual({'hits': 1, 'misses': 2}, cache.getStatistics())
+
+    def testChangedSourceInvalidates(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        self.assertEqual(42, self.compile(cache))
+        mtime = stat(self.path).st_mtime_ns
+        self.writeTemplate('x = 43\n')
+        utime(self.path, ns=(mtime, mtime))
+        self.assertEqual(43, self.compile(cache))
+        self.assertEqual({'hits': 0, 'misses': 2}, cache.getStatistics())
+        self.assertEqual(1, len(listdir(self.cacheDir)))
+
+    def testChangedMtimeInvalidates(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        self.compile(cache)
+        utime(self.path, ns=(1, 1))
+        self.compile(cache)
+        self.assertEqual({'hits': 0, 'misses': 2}, cache.getStatistics())
+
+    def testOtherPythonVersionInvalidates(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        self.compile(cache)
+        originalMagic = templatecodecache.MAGIC_NUMBER
+        templatecodecache.MAGIC_NUMBER = b'\x00\x00\r\n'
+        try:
+            self.compile(cache)
+        finally:
+            templatecodecache.MAGIC_NUMBER = originalMagic
+        self.assertEqual({'hits': 0, 'misses': 2}, cache.getStatistics())
+
+    def testCorruptCacheFileIsIgnored(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        self.compile(cache)
+        cacheFile = join(self.cacheDir, listdir(self.cacheDir)[0])
+        with open(cacheFile, 'rb') as f:
+            data = f.read()
+        with open(cacheFile, 'wb') as f:
+            f.write(data[:-5])
+        self.assertEqual(42, self.compile(cache))
+        self.assertEqual(42, self.compile(cache))
+        self.assertEqual({'hits': 1, 'misses': 2}, cache.getStatistics())
+
+    def testSyntaxErrorIsNotCached(self):
+        cache = TemplateCodeCache(self.cacheDir)
+        self.writeTemplate('x = \n')
+        self.assertRaises(SyntaxError, lambda: self.compile(cache))
+        self.assertEqual([], listdir(self.cacheDir))
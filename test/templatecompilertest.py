@@ -0,0 +1,121 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+from ast import parse, unparse
+from textwrap import dedent
+
+from meresco.html import TagFactory
+from meresco.html.templatecompiler import compileTemplate, StaticTagFolder
+from meresco.html._html._tag import statictag
+
+class TemplateCompilerTest(SeecrTestCase):
+    def fold(self, source):
+        return unparse(StaticTagFolder().visit(parse(dedent(source)))).strip()
+
+    def testFoldLiteralTag(self):
+        self.assertEqual(
+            """with __statictag__(tag, '<div class="foo" id="x">', '</div>') or tag('div.foo', id_='x'):\n    pass""",
+            self.fold("""
+                with tag('div.foo', id_='x'):
+                    pass"""))
+
+    def testFoldClassList(self):
+        self.assertEqual(
+            """with __statictag__(tag, '<p class="a b c">', '</p>') or tag('p.c', class_=['a', 'b']):\n    pass""",
+            self.fold("""
+                with tag('p.c', class_=['a', 'b']):
+                    pass"""))
+
+    def testFoldTagsWithoutClose(self):
+        self.assertEqual(
+            """with __statictag__(tag, '<br/>', '') or tag('br'):\n    pass\nwith __statictag__(tag, '<input type="text">', '') or tag('input', type_='text'):\n    pass""",
+            self.fold("""
+                with tag('br'):
+                    pass
+                with tag('input', type_='text'):
+                    pass"""))
+
+    def testNoFoldingForNonLiterals(self):
+        for source in [
+                "with tag('a', href=url):\n    pass",
+                "with tag(name):\n    pass",
+                "with tag('a', **attrs):\n    pass",
+                "with tag('a', class_={'a'}):\n    pass",
+                "with tag('a') as a:\n    pass",
+                "with self.tag('a'):\n    pass",
+                "with other('a'):\n    pass",
+            ]:
+            self.assertEqual(source, self.fold(source))
+
+    def testFoldNested(self):
+        self.assertEqual(
+            """with __statictag__(tag, '<div>', '</div>') or tag('div'):\n    with tag('a', href=url):\n        with __statictag__(tag, '<span>', '</span>') or tag('span'):\n            yield url""",
+            self.fold("""
+                with tag('div'):
+                    with tag('a', href=url):
+                        with tag('span'):
+                            yield url"""))
+
+    def testFoldedOutputIsEscapedLikeTags(self):
+        source = dedent("""
+            def main(tag, value):
+                yield value
+                with tag('div.outer', data_x=1):
+                    yield value
+                    with tag(''):
+                        yield value
+                    with tag('hr'):
+                        yield value
+                yield value
+            """)
+        def render(foldStaticTags):
+            tag = TagFactory()
+            moduleGlobals = {'__builtins__': {'__statictag__': statictag}}
+            exec(compileTemplate(source, 'test.sf', foldStaticTags=foldStaticTags), moduleGlobals)
+            result = []
+            for value in moduleGlobals['main'](tag, '<&>'):
+                result.extend(tag.lines())
+                result.append(tag.escape(value))
+            result.extend(tag.lines())
+            return ''.join(result)
+        expected = '<&><div class="outer" data_x="1">&lt;&amp;&gt;&lt;&amp;&gt;<hr/>&lt;&amp;&gt;</div><&>'
+        self.assertEqual(expected, render(foldStaticTags=False))
+        self.assertEqual(expected, render(foldStaticTags=True))
+
+    def testFallbackForOtherTagImplementations(self):
+        calls = []
+        class MyTag(object):
+            def __call__(self, *args, **kwargs):
+                calls.append((args, kwargs))
+                return self
+            def __enter__(self):
+                pass
+            def __exit__(self, *args):
+                pass
+        moduleGlobals = {'__builtins__': {'__statictag__': statictag}}
+        exec(compileTemplate("def f(tag):\n    with tag('div', id_='x'):\n        pass\n", 'test.sf', foldStaticTags=True), moduleGlobals)
+        moduleGlobals['f'](MyTag())
+        self.assertEqual([(('div',), {'id_': 'x'})], calls)
@@ -0,0 +1,97 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from seecr.test import SeecrTestCase
+from os import makedirs, remove
+from os.path import join
+from zipfile import ZipFile
+
+from meresco.html import FileSystemLoader, ZipLoader, DictLoader
+
+class TemplateLoadersTest(SeecrTestCase):
+    def testFileSystemLoaderFirstDirectoryWins(self):
+        first = join(self.tempdir, 'first')
+        second = join(self.tempdir, 'second')
+        makedirs(first)
+        makedirs(second)
+        self.write(join(first, 'page.sf'), 'first')
+        self.write(join(second, 'page.sf'), 'second')
+        self.write(join(second, 'other.sf'), 'other')
+        self.write(join(second, 'notes.txt'), 'ignored')
+        loader = FileSystemLoader([first, second])
+        self.assertEqual(['other', 'page'], loader.templateNames())
+        self.assertEqual(join(first, 'page.sf'), loader.path('page'))
+        self.assertEqual(b'first', loader.source('page'))
+        self.assertEqual(None, loader.path('missing'))
+        self.assertEqual([first, second], loader.directories())
+
+    def testFileSystemLoaderIndexesOnlyOnRefresh(self):
+        loader = FileSystemLoader([self.tempdir])
+        self.write(join(self.tempdir, 'page.sf'), 'page')
+        self.assertEqual([], loader.templateNames())
+        loader.refresh()
+        self.assertEqual(['page'], loader.templateNames())
+        remove(join(self.tempdir, 'page.sf'))
+        loader.refresh()
+        self.assertEqual(None, loader.path('page'))
+
+    def testZipLoader(self):
+        archive = join(self.tempdir, 'templates.zip')
+        with ZipFile(archive, 'w') as z:
+            z.writestr('page.sf', 'top')
+            z.writestr('templates/page.sf', 'page')
+            z.writestr('templates/sub/deeper.sf', 'deeper')
+            z.writestr('templates/readme.txt', 'ignored')
+        loader = ZipLoader(archive, directory='templates')
+        self.assertEqual(['page'], loader.templateNames())
+        self.assertEqual(join(archive, 'templates/page.sf'), loader.path('page'))
+        self.assertEqual(b'page', loader.source('page'))
+        self.assertEqual(None, loader.path('deeper'))
+        self.assertEqual([], loader.directories())
+        self.assertEqual(b'top', ZipLoader(archive).source('page'))
+
+    def testZipLoaderReadsArchiveOnce(self):
+        archive = join(self.tempdir, 'templates.zip')
+        with ZipFile(archive, 'w') as z:
+            z.writestr('page.sf', 'page')
+        loader = ZipLoader(archive)
+        remove(archive)
+        self.assertEqual(b'page', loader.source('page'))
+
+    def testDictLoader(self):
+        templates = {'page': 'ünicode', 'raw': b'bytes'}
+        loader = DictLoader(templates)
+        self.assertEqual(['page', 'raw'], loader.templateNames())
+        self.assertEqual('ünicode'.encode('utf-8'), loader.source('page'))
+        self.assertEqual(b'bytes', loader.source('raw'))
+        self.assertEqual('<DictLoader>/page.sf', loader.path('page'))
+        self.assertEqual(None, loader.path('missing'))
+        templates['added'] = 'new'
+        self.assertEqual(['added', 'page', 'raw'], loader.templateNames())
+
+    def write(self, path, contents):
+        with open(path, 'w') as f:
+            f.write(contents)
@@ -0,0 +1,80 @@
+## begin license ##
+#
+# "Meresco Html" is a template engine based on generators, and a sequel to Slowfoot.
+# It is also known as "DynamicHtml" or "Seecr Html".
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) https://seecr.nl
+#
+# This file is part of "Meresco Html"
+#
+# "Meresco Html" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco Html" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco Html"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase, CallTrace
+
+from weightless.core import be, compose
+
+from meresco.html import DynamicHtml
+from meresco.html.templatemetrics import TemplateMetrics, TemplateMetricsReport
+
+class TemplateMetricsTest(SeecrTestCase):
+    def testRecord(self):
+        metrics = TemplateMetrics(buckets=[0.1, 1.0])
+        metrics.record('page', 0.05, 0.5, 100, 0)
+        metrics.record('page', 0.1, 2.0, 20, 1)
+        self.assertEqual({'page': {
+                'requests': 2,
+                'errors': 1,
+                'bytes': 120,
+                'firstChunkTime': 0.15000000000000002,
+                'renderTime': 2.5,
+                'firstChunkHistogram': [(0.1, 2), (1.0, 0), (None, 0)],
+                'renderTimeHistogram': [(0.1, 0), (1.0, 1), (None, 1)],
+            }}, metrics.getMetrics())
+
+    def testDynamicHtmlRecordsPerHeadTemplate(self):
+        with open(self.tempdir + '/page.sf', 'w') as f:
+            f.write('def main(pipe, **kwargs):\n    yield "é"\n    yield pipe\n')
+        with open(self.tempdir + '/broken.sf', 'w') as f:
+            f.write('def main(**kwargs):\n    yield 1/0\n')
+        d = DynamicHtml([self.tempdir], reactor=CallTrace('Reactor'))
+        list(compose(d.handleRequest(path='/page/page')))
+        list(compose(d.handleRequest(path='/broken')))
+        list(compose(d.handleRequest(path='/missing')))
+        metrics = d.getTemplateMetrics()
+        self.assertEqual(['broken', 'page'], sorted(metrics))
+        self.assertEqual((1, 0, 59 + 4), (metrics['page']['requests'], metrics['page']['errors'], metrics['page']['bytes']))
+        self.assertEqual((1, 1), (metrics['broken']['requests'], metrics['broken']['errors']))
+        self.assertTrue(0 <= metrics['page']['firstChunkTime'] <= metrics['page']['renderTime'], metrics['page'])
+
+    def testReport(self):
+        metrics = TemplateMetrics(buckets=[1.0])
+        metrics.record('page', 0.5, 2.0, 100, 0)
+        observer = CallTrace(methods={'getTemplateMetrics': metrics.getMetrics})
+        report = be((TemplateMetricsReport(name='templates'), (observer,)))
+        list(compose(report.handleReport()))
+        self.assertEqual(['getTemplateMetrics', 'report'], observer.calledMethodNames())
+        self.assertEqual({'templates': {'Templates': {'page': {
+                'requests': {'count': 1},
+                'errors': {'count': 0},
+                'bytes': {'memory': 100},
+                'firstChunkTime': {'time': 0.5},
+                'renderTime': {'time': 2.0},
+                'firstChunkHistogram_1s': {'count': 1},
+                'firstChunkHistogram_inf': {'count': 0},
+                'renderTimeHistogram_1s': {'count': 0},
+                'renderTimeHistogram_inf': {'count': 1},
+            }}}}, observer.calledMethods[1].kwargs['values'])